@@ -1,25 +1,118 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+import os
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from typing import Union
-from tools import process_input
-from llm import process_url
+from tools import aprocess_input, paper_store, source_caches, title_cache
+from llm import checkpoint_store_size, script_cache
+from audio import segment_cache
+from compaction import compaction_stats
+import http_client
+import components
+from jobs import PODCAST_DIR, SECTION_RETENTION, JobQueue, JobStore, prune_sections, run_podcast_job, stream_sections
+from media import MEDIA_PROFILES, SOURCE_PROFILE, encode_profile, media_response, resolve_media
+from query_cache import normalize_query
+from singleflight import AsyncSingleFlight
 
-app = FastAPI()
+job_queue = JobQueue(JobStore(), run_podcast_job)
+query_flights = AsyncSingleFlight("query")
+
+async def prune_sections_periodically():
+    while True:
+        try:
+            await asyncio.to_thread(prune_sections, job_queue.store)
+        except Exception as e:
+            print(f"Error pruning streamed sections: {e}")
+        await asyncio.sleep(max(SECTION_RETENTION / 4, 1))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    components.warm_up_from_env()
+    job_queue.resume()
+    pruner = asyncio.create_task(prune_sections_periodically())
+    yield
+    pruner.cancel()
+    job_queue.shutdown()
+    if components.registry.built("async_http"):
+        await components.get("async_http").aclose()
+
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
 
+@app.get("/metrics")
+def read_metrics():
+    return {
+        "checkpoints": checkpoint_store_size(),
+        "segment_cache": segment_cache.stats(),
+        "script_cache": script_cache.stats(),
+        "compaction": compaction_stats.stats(),
+        "paper_store": paper_store.stats(),
+        "http": http_client.stats(),
+        "components": components.registry.stats(),
+        "coalescing": {"query": query_flights.stats(), "podcast_jobs": job_queue.coalesced},
+        "query_cache": {
+            "title": title_cache.stats(),
+            **{source: cache.stats() for source, cache in source_caches.items()},
+        },
+    }
+
 @app.get("/query")
-def read_query(q: Union[str, None] = None):
+async def read_query(q: Union[str, None] = None):
     if q:
-        result = process_input(q)
+        result = await query_flights.do(normalize_query(q), lambda: aprocess_input(q))
         return {"papers": result}
     return {"query": "No query provided"}
 
 @app.get("/create_podcast")
-def create_podcast(url: Union[str, None] = None):
+async def create_podcast(url: Union[str, None] = None):
     if url:
-        script = process_url(url)
-        file_path = "podcast.mp3"
-        
+        job = await asyncio.to_thread(job_queue.submit, url)
+        return {"job_id": job["id"], "status": job["status"]}
     return {"query": "No query provided"}
+
+@app.get("/jobs/{job_id}")
+def read_job(job_id: str):
+    job = job_queue.store.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["output_path"]:
+        job = {**job, "media_url": f"/media/{os.path.basename(job['output_path'])}"}
+    return job
+
+@app.api_route("/jobs/{job_id}/audio", methods=["GET", "HEAD"])
+def read_job_audio(job_id: str, request: Request, profile: str = SOURCE_PROFILE):
+    job = job_queue.store.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "completed" or not job["output_path"]:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    if profile not in MEDIA_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown profile: {profile}")
+    try:
+        path = job["output_path"] if profile == SOURCE_PROFILE else encode_profile(job["output_path"], profile)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return media_response(request.headers, path, filename=f"{job_id}.{MEDIA_PROFILES[profile]['ext']}")
+
+@app.api_route("/media/{file_name}", methods=["GET", "HEAD"])
+def read_media(file_name: str, request: Request):
+    try:
+        path = resolve_media(PODCAST_DIR, file_name)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Media not found")
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return media_response(request.headers, path)
+
+@app.get("/jobs/{job_id}/stream")
+def stream_job_audio(job_id: str):
+    job = job_queue.store.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=409, detail="Job failed")
+    return StreamingResponse(stream_sections(job_queue.store, job_id), media_type="audio/mpeg")
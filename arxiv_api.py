@@ -0,0 +1,61 @@
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlencode
+
+import lxml.etree
+
+ARXIV_API_URL = os.getenv("ARXIV_API_URL", "https://export.arxiv.org/api/query")
+ATOM = "{http://www.w3.org/2005/Atom}"
+ARXIV = "{http://arxiv.org/schemas/atom}"
+ABS_PREFIX = re.compile(r"^https?://arxiv\.org/abs/")
+
+
+def query_url(search_query: Optional[str] = None, id_list: Sequence[str] = (), max_results: int = 10) -> str:
+    """arXiv API query URL for a search and/or an ID list, most relevant first."""
+    params = {"start": 0, "max_results": max_results, "sortBy": "relevance", "sortOrder": "descending"}
+    if search_query:
+        params["search_query"] = search_query
+    if id_list:
+        params["id_list"] = ",".join(id_list)
+    return f"{ARXIV_API_URL}?{urlencode(params)}"
+
+
+def _text(entry: Any, path: str) -> str:
+    return " ".join((entry.findtext(path) or "").split())
+
+
+def parse_entry(entry: Any) -> Dict[str, Any]:
+    entry_id = _text(entry, f"{ATOM}id")
+    published = datetime.fromisoformat(_text(entry, f"{ATOM}published").replace("Z", "+00:00"))
+    pdf_url = next((link.get("href") for link in entry.iter(f"{ATOM}link") if link.get("title") == "pdf"), None)
+    return {
+        "title": _text(entry, f"{ATOM}title"),
+        "summary": (entry.findtext(f"{ATOM}summary") or "").strip(),
+        "pdf_url": pdf_url,
+        "authors": [_text(author, f"{ATOM}name") for author in entry.iter(f"{ATOM}author")],
+        "published": published.isoformat(),
+        "year": published.year,
+        "arxiv_id": ABS_PREFIX.sub("", entry_id),
+        "doi": _text(entry, f"{ARXIV}doi") or None,
+        "categories": [category.get("term") for category in entry.iter(f"{ATOM}category")],
+        "entry_id": entry_id,
+        "source": "arxiv",
+    }
+
+
+def parse_feed(content: bytes) -> List[Dict[str, Any]]:
+    """
+    Papers in an arXiv API Atom response, in feed order. Raises ValueError
+    when the API reports an error (it does so as an entry in the feed).
+    """
+    root = lxml.etree.fromstring(content)
+    papers = []
+    for entry in root.iter(f"{ATOM}entry"):
+        if "/api/errors" in _text(entry, f"{ATOM}id"):
+            raise ValueError(f"arXiv API error: {_text(entry, f'{ATOM}summary')}")
+        if entry.find(f"{ATOM}title") is None or entry.find(f"{ATOM}published") is None:
+            continue
+        papers.append(parse_entry(entry))
+    return papers
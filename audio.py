@@ -1,126 +1,515 @@
+import hashlib
+import io
 import json
 import os
-from gtts import gTTS
+import tempfile
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+import numpy as np
 from pydub import AudioSegment
-from pydub.effects import normalize, speedup
+import components
+import dsp
+from segment_cache import SegmentCache
 
+segment_cache = SegmentCache(
+    cache_dir=os.getenv("AUDIO_CACHE_DIR", "segment_cache"),
+    max_bytes=int(os.getenv("AUDIO_CACHE_MAX_BYTES", str(512 * 1024 * 1024))),
+)
 
-def combine_audio_files(file_paths, output_path):
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "6"))
+TTS_RETRIES = int(os.getenv("TTS_RETRIES", "3"))
+TTS_BACKOFF = float(os.getenv("TTS_BACKOFF", "1.0"))
+AUDIO_PLAYBACK_SPEED = float(os.getenv("AUDIO_PLAYBACK_SPEED", "1.3"))
+AUDIO_NORMALIZATION = os.getenv("AUDIO_NORMALIZATION", "peak")
+AUDIO_TARGET_LUFS = float(os.getenv("AUDIO_TARGET_LUFS", "-16"))
+AUDIO_DSP_WORKERS = int(os.getenv("AUDIO_DSP_WORKERS", "4"))
+AUDIO_OUTPUT_DIR = os.getenv("PODCAST_DIR", "podcasts")
+
+SECTIONS = [
+    "host_intro", "paper_overview", "key_insights", "methodology",
+    "results", "real_world_applications", "limitations",
+    "conclusion", "outro"
+]
+
+
+def decode_segment(clip):
+    """Decode an encoded clip held in memory as bytes."""
+    return AudioSegment.from_file(io.BytesIO(clip), format="wav" if clip[:4] == b"RIFF" else None)
+
+
+def load_segments(clips, frame_rate=None, channels=None, sample_width=None):
     """
-    Concatenate multiple audio files into a single output file.
+    Decode each in-memory clip once, converting every segment to the given
+    format or, by default, to the format of the first one that decodes
+    successfully.
     """
-    combined_audio = AudioSegment.empty()
-    for file_path in file_paths:
-        if os.path.exists(file_path):
-            try:
-                audio = AudioSegment.from_file(file_path)
-                combined_audio += audio
-            except Exception as e:
-                print(f"Error processing {file_path}: {e}")
+    for index, clip in enumerate(clips):
+        try:
+            audio = decode_segment(clip)
+        except Exception as e:
+            print(f"Error processing clip {index}: {e}")
+            continue
+        if frame_rate is None:
+            frame_rate, channels, sample_width = audio.frame_rate, audio.channels, audio.sample_width
         else:
-            print(f"File not found: {file_path}")
-    combined_audio = normalize(combined_audio)
-    combined_audio = speedup(combined_audio, playback_speed=1.3)
-    file_ext = os.path.splitext(output_path)[1][1:]
-    combined_audio.export(output_path, format=file_ext)
+            audio = audio.set_frame_rate(frame_rate).set_channels(channels).set_sample_width(sample_width)
+        yield audio
 
 
-def create_audio_from_json(json_data, output_file="podcast.mp3"):
+def stretch_segments(segments, playback_speed=AUDIO_PLAYBACK_SPEED, max_workers=AUDIO_DSP_WORKERS):
     """
-    Convert JSON podcast script to audio with two alternating speakers
-    and combine into one audio file.
+    Time-stretch every segment in parallel, returning float arrays plus the
+    frame rate and sample width they share.
     """
-    podcast_data = json.loads(json_data) if isinstance(json_data, str) else json_data
+    segments = list(segments)
+    if not segments:
+        return [], None, None
+    frame_rate, sample_width = segments[0].frame_rate, segments[0].sample_width
+
+    def stretch(audio):
+        return dsp.time_stretch(dsp.segment_to_array(audio), frame_rate, playback_speed)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="dsp") as executor:
+        arrays = list(executor.map(stretch, segments))
+    return arrays, frame_rate, sample_width
+
+
+def gain_for(peak, blocks=None, normalization=AUDIO_NORMALIZATION, target_lufs=AUDIO_TARGET_LUFS):
+    """
+    Peak normalization gain, or LUFS normalization gain from loudness blocks
+    capped so the loudest sample does not clip.
+    """
+    gain = dsp.peak_gain(peak)
+    if normalization == "lufs" and blocks is not None:
+        gain = min(dsp.loudness_gain(blocks, target_lufs), gain)
+    return gain
+
+
+def normalization_gain(arrays, frame_rate, normalization=AUDIO_NORMALIZATION, target_lufs=AUDIO_TARGET_LUFS):
+    """
+    One gain for all arrays: peak normalization, or LUFS normalization capped
+    so the loudest sample does not clip.
+    """
+    if not arrays:
+        return 1.0
+    blocks = None
+    if normalization == "lufs":
+        blocks = np.concatenate([dsp.loudness_blocks(samples, frame_rate) for samples in arrays])
+    return gain_for(max(dsp.peak(samples) for samples in arrays), blocks, normalization, target_lufs)
+
+
+PCM_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+PCM_CHUNK_FRAMES = 1 << 18
+
+
+def write_pcm(out, samples, factor):
+    """
+    Scale float samples by factor and store them rounded and clipped in the
+    integer array out, a chunk at a time so the float temporary stays small.
+    """
+    limit = float(np.iinfo(out.dtype).max)
+    for start in range(0, len(samples), PCM_CHUNK_FRAMES):
+        chunk = np.multiply(samples[start:start + PCM_CHUNK_FRAMES], factor, dtype=np.float32)
+        np.round(chunk, out=chunk)
+        np.clip(chunk, -limit - 1, limit, out=chunk)
+        out[start:start + len(chunk)] = chunk
+
+
+def pcm_buffer(frames, channels, sample_width):
+    """A zeroed PCM buffer and a (frames, channels) integer view of it to fill in place."""
+    data = bytearray(frames * channels * sample_width)
+    return data, np.frombuffer(data, dtype=PCM_DTYPES[sample_width]).reshape(-1, channels)
+
+
+def join_segments(arrays, frame_rate, sample_width, gain=1.0):
+    """Apply gain and write float arrays into one preallocated AudioSegment buffer."""
+    if not arrays:
+        return AudioSegment.empty()
+    data, out = pcm_buffer(sum(len(samples) for samples in arrays), arrays[0].shape[1], sample_width)
+    full_scale = float(1 << (8 * sample_width - 1))
+    position = 0
+    for samples in arrays:
+        write_pcm(out[position:position + len(samples)], samples, gain * full_scale)
+        position += len(samples)
+    return AudioSegment(data=data, sample_width=sample_width, frame_rate=frame_rate, channels=out.shape[1])
+
+
+class EpisodePCM:
+    """
+    Rendered sections of an episode appended to one integer PCM buffer as
+    they finish, so a long job holds its audio once, at the sample width it
+    is exported at, rather than as float32. A section whose stretched peak
+    exceeds full scale is stored scaled down by that peak; peaks and
+    loudness blocks are kept alongside, so the episode gain needs no extra
+    pass and join() applies it in place.
+    """
+
+    def __init__(self, frame_rate, sample_width, channels, normalization=AUDIO_NORMALIZATION):
+        self.frame_rate = frame_rate
+        self.sample_width = sample_width
+        self.channels = channels
+        self.normalization = normalization
+        self.data = bytearray()
+        self.sections = []
+        self.segments = 0
+        self.peak = 0.0
+        self.blocks = []
+
+    def add(self, arrays):
+        """Quantize one section's stretched float arrays onto the buffer and record its peak and loudness."""
+        if not arrays:
+            return
+        peak = max(dsp.peak(samples) for samples in arrays)
+        scale = 1.0 / peak if peak > 1.0 else 1.0
+        if self.normalization == "lufs":
+            self.blocks.extend(dsp.loudness_blocks(samples, self.frame_rate) for samples in arrays)
+        full_scale = float(1 << (8 * self.sample_width - 1))
+        for samples in arrays:
+            pcm = np.empty((len(samples), self.channels), dtype=PCM_DTYPES[self.sample_width])
+            write_pcm(pcm, samples, scale * full_scale)
+            self.data += pcm.data
+        self.sections.append((sum(len(samples) for samples in arrays), scale))
+        self.segments += len(arrays)
+        self.peak = max(self.peak, peak)
+
+    def gain(self, target_lufs=AUDIO_TARGET_LUFS):
+        blocks = np.concatenate(self.blocks) if self.blocks else None
+        return gain_for(self.peak, blocks, self.normalization, target_lufs)
+
+    def join(self, gain=1.0):
+        """Apply gain to the buffer in place and hand it over as one AudioSegment. Empties the episode."""
+        if not self.sections:
+            return AudioSegment.empty()
+        data, self.data = self.data, bytearray()
+        samples = np.frombuffer(data, dtype=PCM_DTYPES[self.sample_width]).reshape(-1, self.channels)
+        position = 0
+        for frames, scale in self.sections:
+            section = samples[position:position + frames]
+            write_pcm(section, section, gain / scale)
+            position += frames
+        self.sections = []
+        del samples, section
+        return AudioSegment(data=data, sample_width=self.sample_width, frame_rate=self.frame_rate, channels=self.channels)
 
-    temp_dir = "temp_audio"
-    audio_files = []
-    os.makedirs(temp_dir, exist_ok=True)
-    def text_to_audio(text, filename, voice_tld):
+
+def export_stream_chunk(audio, output_path):
+    """
+    Export audio as a bare mp3 frame stream (no ID3/Xing headers) and move it
+    into place atomically, so chunks can be appended to one HTTP stream.
+    """
+    tmp_path = f"{output_path}.part"
+    audio.export(tmp_path, format="mp3", parameters=["-write_xing", "0", "-id3v2_version", "0"])
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def export_content_addressed(audio, output_dir, fmt="mp3"):
+    """
+    Encode audio in memory and store it in output_dir under the SHA-256 of
+    the encoded bytes, so parallel renders never share a path and identical
+    episodes share one file. Returns the path.
+    """
+    buffer = io.BytesIO()
+    audio.export(buffer, format=fmt)
+    data = buffer.getvalue()
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"{hashlib.sha256(data).hexdigest()}.{fmt}")
+    if os.path.exists(output_path):
+        return output_path
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix=".tmp-", suffix=f".{fmt}")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, output_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return output_path
+
+
+def synthesize_lines(texts, names, voices, backend=None):
+    """
+    Synthesize a batch of dialogue lines in one backend call, reusing the
+    segment cache. Returns one encoded clip (bytes) per line, None for
+    empty text, and raises on synthesis errors so the caller can retry.
+    """
+    backend = backend or components.get("tts")
+    clips = [None] * len(texts)
+    pending = []
+    for index, (text, name, voice) in enumerate(zip(texts, names, voices)):
         if not text or not isinstance(text, str):
-            print(f"Skipping empty or invalid text for {filename}")
-            return None
+            print(f"Skipping empty or invalid text for {name}")
+            continue
+        cache_key = segment_cache.key(text, voice, lang='en', backend=backend.name)
+        cached_clip = segment_cache.get_bytes(cache_key, backend.ext)
+        if cached_clip:
+            print(f"Cache hit: {name} with voice {voice}")
+            clips[index] = cached_clip
+        else:
+            pending.append((index, cache_key))
+    if not pending:
+        return clips
+    synthesized = backend.synthesize([texts[index] for index, _ in pending], [voices[index] for index, _ in pending])
+    for (index, cache_key), clip in zip(pending, synthesized):
+        print(f"Generated: {names[index]} with voice {voices[index]} ({backend.name})")
+        clips[index] = clip
         try:
-            tts = gTTS(text=text, lang='en', tld=voice_tld)
-            tts.save(filename)
-            print(f"Generated: {filename} with voice {voice_tld}")
-            return filename
+            segment_cache.put_bytes(cache_key, clip, backend.ext)
+        except OSError as e:
+            print(f"Error caching {names[index]}: {e}")
+    return clips
+
+
+def synthesize_with_retry(texts, names, voices, backend=None, retries=TTS_RETRIES, backoff=TTS_BACKOFF):
+    """
+    Call synthesize_lines, retrying failures with jittered exponential backoff.
+    A batch that still fails yields None for every line.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return synthesize_lines(texts, names, voices, backend)
         except Exception as e:
-            print(f"Error generating audio for {filename}: {e}")
-            return None
-    def get_voice_tld(speaker_str):
-        if "UK" in speaker_str:
-            return "co.uk"
-        elif "India" in speaker_str:
-            return "co.in"
-        else:
-            return "com"
-    sections = [
-        "host_intro", "paper_overview", "key_insights", "methodology",
-        "results", "real_world_applications", "limitations",
-        "conclusion", "outro"
-    ]
-
-    for section_key in sections:
-        print(f"Processing section: {section_key}...")
-        section_data = podcast_data.get(section_key)
-
-        if not section_data:
-            print(f"Warning: Section '{section_key}' not found or empty in JSON data.")
+            if attempt == retries:
+                print(f"Error generating audio for {', '.join(names)}: {e}")
+                return [None] * len(texts)
+            delay = backoff * (2 ** attempt) + random.uniform(0, backoff)
+            print(f"Retrying {len(texts)} line(s) in {delay:.1f}s after error: {e}")
+            time.sleep(delay)
+
+
+def collect_insight_block(i, insight_block, section_key="key_insights"):
+    """
+    Dialogue items for one key_insights block.
+    """
+    items = []
+    if not isinstance(insight_block, list):
+        print(f"Warning: Expected list for insight block {i} in '{section_key}', got {type(insight_block)}.")
+        return items
+    for j, dialogue_item in enumerate(insight_block):
+        if not isinstance(dialogue_item, dict):
+            print(f"Warning: Expected dict for item {j} in insight block {i}, got {type(dialogue_item)}.")
             continue
+        items.append({
+            "section": section_key,
+            "speaker": dialogue_item.get("speaker", ""),
+            "dialogue": dialogue_item.get("dialogue", ""),
+            "name": f"{section_key}_{i}_{j}",
+        })
+    return items
 
-        if section_key == "key_insights":
-            if isinstance(section_data, list):
-                for i, insight_block in enumerate(section_data):
-                    if isinstance(insight_block, list):
-                        for j, dialogue_item in enumerate(insight_block):
-                            speaker = dialogue_item.get("speaker", "")
-                            dialogue = dialogue_item.get("dialogue", "")
-                            voice_tld = get_voice_tld(speaker)
-                            filename = os.path.join(temp_dir, f"{section_key}_{i}_{j}.mp3")
-                            audio_file = text_to_audio(dialogue, filename, voice_tld)
-                            if audio_file:
-                                audio_files.append(audio_file)
-                    else:
-                         print(f"Warning: Expected list for insight block {i} in '{section_key}', got {type(insight_block)}.")
-            else:
-                print(f"Warning: Expected list for '{section_key}', got {type(section_data)}.")
-
-        elif isinstance(section_data, list):
-            for i, dialogue_item in enumerate(section_data):
-                 if isinstance(dialogue_item, dict):
-                    speaker = dialogue_item.get("speaker", "")
-                    dialogue = dialogue_item.get("dialogue", "")
-                    voice_tld = get_voice_tld(speaker)
-                    filename = os.path.join(temp_dir, f"{section_key}_{i}.mp3")
-                    audio_file = text_to_audio(dialogue, filename, voice_tld)
-                    if audio_file:
-                        audio_files.append(audio_file)
-                 else:
-                     print(f"Warning: Expected dict for item {i} in '{section_key}', got {type(dialogue_item)}.")
+
+def collect_section(section_key, section_data):
+    """
+    Dialogue items for one section of the podcast script, in playback order.
+    """
+    items = []
+    if not section_data:
+        print(f"Warning: Section '{section_key}' not found or empty in JSON data.")
+        return items
+
+    if section_key == "key_insights":
+        if isinstance(section_data, list):
+            for i, insight_block in enumerate(section_data):
+                items.extend(collect_insight_block(i, insight_block, section_key))
         else:
-            print(f"Warning: Expected list for section '{section_key}', got {type(section_data)}. Skipping.")
+            print(f"Warning: Expected list for '{section_key}', got {type(section_data)}.")
+
+    elif isinstance(section_data, list):
+        for i, dialogue_item in enumerate(section_data):
+            if isinstance(dialogue_item, dict):
+                items.append({
+                    "section": section_key,
+                    "speaker": dialogue_item.get("speaker", ""),
+                    "dialogue": dialogue_item.get("dialogue", ""),
+                    "name": f"{section_key}_{i}",
+                })
+            else:
+                print(f"Warning: Expected dict for item {i} in '{section_key}', got {type(dialogue_item)}.")
+    else:
+        print(f"Warning: Expected list for section '{section_key}', got {type(section_data)}. Skipping.")
+    return items
+
+
+def collect_dialogue(podcast_data):
+    """
+    Flatten the podcast script into dialogue items in playback order.
+    """
+    items = []
+    for section_key in SECTIONS:
+        items.extend(collect_section(section_key, podcast_data.get(section_key)))
+    return items
 
-    print(f"\nCombining {len(audio_files)} audio files into {output_file}...")
-    combine_audio_files(audio_files, output_file)
 
-    print("Cleaning up temporary files...")
-    if os.path.exists(temp_dir):
+class PodcastRenderer:
+    """
+    Renders a podcast script while its sections are still arriving, e.g.
+    from a streamed LLM response.
+
+    Dialogue lines go to a bounded worker pool as soon as their section
+    (or key_insights block) is known, in batches of up to the TTS
+    backend's max_batch lines per call. Finished sections are time-stretched
+    and handed to section_callback in playback order, once every earlier
+    section is done too, on a publisher thread of their own so that slow
+    exports never hold up the TTS workers; finish() joins everything into a content-addressed
+    file. Clips stay in memory from synthesis to export, so renders share
+    no scratch files and can run in parallel. progress_callback is called with (done, submitted) as lines finish.
+    """
+
+    def __init__(self, max_workers=TTS_CONCURRENCY, retries=TTS_RETRIES, backoff=TTS_BACKOFF,
+                 progress_callback=None, section_callback=None, backend=None):
+        self.backend = backend or components.get("tts")
+        self.retries = retries
+        self.backoff = backoff
+        self.progress_callback = progress_callback
+        self.section_callback = section_callback
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="tts")
+        self.publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="publish")
+        self.futures = {section_key: [] for section_key in SECTIONS}
+        self.block_sections = set()
+        self.closed = set()
+        self.generation_done = False
+        self.submitted = 0
+        self.completed = 0
+        self.next_section = 0
+        self.episode = None
+        self.audio_format = {}
+        self._lock = threading.Lock()
+
+    def _submit(self, items):
+        batch_size = max(1, self.backend.max_batch)
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            future = self.executor.submit(
+                synthesize_with_retry, [item["dialogue"] for item in batch], [item["name"] for item in batch],
+                [self.backend.voice_for(item["speaker"]) for item in batch], self.backend, self.retries, self.backoff
+            )
+            with self._lock:
+                self.submitted += len(batch)
+                self.futures[batch[0]["section"]].append(future)
+            future.add_done_callback(lambda _future, lines=len(batch): self._lines_done(lines))
+
+    def _lines_done(self, lines):
+        with self._lock:
+            self.completed += lines
+            done, total = self.completed, self.submitted
+        if self.progress_callback:
+            self.progress_callback(done, total)
+        self._schedule_advance()
+
+    def add_block(self, section_key, index, block):
+        """Start synthesizing one key_insights block before the whole list is complete."""
+        if section_key not in SECTIONS or section_key in self.closed:
+            return
+        self.block_sections.add(section_key)
+        self._submit(collect_insight_block(index, block, section_key))
+
+    def add_section(self, section_key, section_data):
+        """Add a complete section; sections already fed block by block are only marked complete."""
+        if section_key not in SECTIONS or section_key in self.closed:
+            return
+        if section_key not in self.block_sections:
+            self._submit(collect_section(section_key, section_data))
+        with self._lock:
+            self.closed.add(section_key)
+        self._schedule_advance()
+
+    def _schedule_advance(self):
         try:
-            for file in os.listdir(temp_dir):
-                os.remove(os.path.join(temp_dir, file))
-            os.rmdir(temp_dir)
-            print("Temporary directory removed.")
-        except OSError as e:
-            print(f"Error removing temporary directory {temp_dir}: {e}")
+            self.publisher.submit(self._advance)
+        except RuntimeError:
+            pass  # finished or cancelled; finish() publishes whatever is left itself
+
+    def _advance(self):
+        """Publish every section that is ready, in order. Only runs on the publisher thread."""
+        while self.next_section < len(SECTIONS):
+            section_key = SECTIONS[self.next_section]
+            with self._lock:
+                closed = section_key in self.closed
+                generation_done = self.generation_done
+                futures = list(self.futures[section_key])
+            if not closed and not generation_done:
+                return
+            if not all(future.done() for future in futures):
+                return
+            if not closed:
+                print(f"Warning: Section '{section_key}' not found or empty in JSON data.")
+            self._render_section(section_key, [clip for future in futures for clip in future.result()])
+            self.next_section += 1
+
+    def _render_section(self, section_key, clips):
+        clips = [clip for clip in clips if clip]
+        section_arrays, frame_rate, sample_width = stretch_segments(load_segments(clips, **self.audio_format))
+        if not section_arrays:
+            return
+        if not self.audio_format:
+            self.audio_format = {"frame_rate": frame_rate, "sample_width": sample_width, "channels": section_arrays[0].shape[1]}
+            self.episode = EpisodePCM(**self.audio_format)
+        if self.section_callback:
+            gain = normalization_gain(section_arrays, frame_rate)
+            self.section_callback(section_key, join_segments(section_arrays, frame_rate, sample_width, gain))
+        self.episode.add(section_arrays)
+
+    def finish(self, output_dir=AUDIO_OUTPUT_DIR, fmt="mp3"):
+        """
+        Wait for all lines, publish the remaining sections and export the full
+        episode into output_dir. Returns its path, or None if nothing rendered.
+        """
+        with self._lock:
+            self.generation_done = True
+            futures = [future for section_futures in self.futures.values() for future in section_futures]
+        wait(futures)
+        self.executor.shutdown()
+        try:
+            self.publisher.submit(self._advance).result()
+        finally:
+            self.publisher.shutdown()
+
+        output_path = None
+        print(f"\nCombining {self.episode.segments if self.episode else 0} audio segments into {output_dir}...")
+        if self.episode and self.episode.sections:
+            combined_audio = self.episode.join(self.episode.gain())
+            output_path = export_content_addressed(combined_audio, output_dir, fmt)
+            print(f"Wrote {output_path}")
+        print(f"Segment cache: {segment_cache.stats()}")
+        return output_path
+
+    def cancel(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.publisher.shutdown(wait=True, cancel_futures=True)
+
+
+def create_audio_from_json(json_data, output_dir=AUDIO_OUTPUT_DIR, max_workers=TTS_CONCURRENCY, fmt="mp3",
+                           progress_callback=None, section_callback=None, backend=None):
+    """
+    Convert JSON podcast script to audio with two alternating speakers
+    and combine into one audio file in output_dir, named by its content
+    hash. Returns the file's path.
+    section_callback, if given, is called with (section_key, AudioSegment)
+    for each section in playback order as soon as it has been rendered,
+    so callers can start streaming before the whole episode is done.
+    """
+    podcast_data = json.loads(json_data) if isinstance(json_data, str) else json_data
+
+    renderer = PodcastRenderer(max_workers, progress_callback=progress_callback,
+                               section_callback=section_callback, backend=backend)
+    print(f"Synthesizing dialogue with {renderer.backend.name} and {max_workers} workers...")
+    for section_key in SECTIONS:
+        renderer.add_section(section_key, podcast_data.get(section_key))
+    return renderer.finish(output_dir, fmt)
+
+
 if __name__ == "__main__":
     try:
         with open('podcast_script.json', 'r') as f:
             podcast_json_data = json.load(f)
-        create_audio_from_json(podcast_json_data, "ai4sg_podcast.mp3")
-        print("Podcast audio created successfully.")
+        output_path = create_audio_from_json(podcast_json_data)
+        print(f"Podcast audio created successfully: {output_path}")
     except FileNotFoundError:
         print("Error: podcast_script.json not found.")
     except json.JSONDecodeError:
         print("Error: Could not decode JSON from podcast_script.json.")
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
\ No newline at end of file
+        print(f"An unexpected error occurred: {e}")
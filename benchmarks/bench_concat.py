@@ -0,0 +1,80 @@
+"""
+Compare the old AudioSegment += loop with the renderer's path on
+synthetic 10, 30 and 60 minute episodes of in-memory WAV clips: each of
+the nine sections is decoded with load_segments, converted with
+stretch_segments at 1x and quantized into an EpisodePCM, which then joins
+the episode into one preallocated buffer.
+
+Usage: python benchmarks/bench_concat.py [--minutes 10 30 60] [--legacy-max 30]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from audio import SECTIONS, EpisodePCM, load_segments, stretch_segments
+
+SEGMENT_SECONDS = 8
+FRAME_RATE = 24000
+
+
+def legacy_concatenate(clips):
+    combined_audio = AudioSegment.empty()
+    for clip in clips:
+        combined_audio += AudioSegment.from_file(io.BytesIO(clip), format="wav")
+    return combined_audio
+
+
+def render_concatenate(clips):
+    per_section = -(-len(clips) // len(SECTIONS))
+    episode = None
+    for start in range(0, len(clips), per_section):
+        arrays, frame_rate, sample_width = stretch_segments(load_segments(clips[start:start + per_section]), playback_speed=1.0)
+        episode = episode or EpisodePCM(frame_rate, sample_width, arrays[0].shape[1])
+        episode.add(arrays)
+    return episode.join(episode.gain())
+
+
+def synthetic_clips(minutes):
+    segment = Sine(220).to_audio_segment(duration=SEGMENT_SECONDS * 1000).set_frame_rate(FRAME_RATE).set_channels(1)
+    buffer = io.BytesIO()
+    segment.export(buffer, format="wav")
+    return [buffer.getvalue()] * (minutes * 60 // SEGMENT_SECONDS)
+
+
+def measure(fn, clips):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn(clips)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--minutes", type=int, nargs="+", default=[10, 30, 60])
+    parser.add_argument("--legacy-max", type=int, default=60, help="skip the += loop for longer episodes")
+    args = parser.parse_args()
+
+    print(f"{'minutes':>8} {'path':>8} {'seconds':>9} {'peak MiB':>9} {'length s':>9}")
+    for minutes in args.minutes:
+        clips = synthetic_clips(minutes)
+        runs = [("render", render_concatenate)]
+        if minutes <= args.legacy_max:
+            runs.append(("legacy", legacy_concatenate))
+        for name, fn in runs:
+            elapsed, peak, length_ms = measure(fn, clips)
+            print(f"{minutes:>8} {name:>8} {elapsed:>9.2f} {peak / 2**20:>9.1f} {length_ms / 1000:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
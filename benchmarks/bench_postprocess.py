@@ -0,0 +1,70 @@
+"""
+Compare pydub normalize + speedup with the renderer's post-processing
+(stretch_segments, normalization_gain, join_segments) on a synthetic
+speech-like episode split into dialogue-sized segments.
+
+Usage: python benchmarks/bench_postprocess.py [--minutes 2 10] [--speed 1.3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.effects import normalize, speedup
+
+import dsp
+from audio import join_segments, normalization_gain, stretch_segments
+
+FRAME_RATE = 24000
+SEGMENT_SECONDS = 8
+
+
+def synthetic_segment(rng):
+    """Voiced harmonics with a syllable-rate envelope and short pauses."""
+    t = np.arange(SEGMENT_SECONDS * FRAME_RATE) / FRAME_RATE
+    pitch = rng.uniform(100, 220)
+    voiced = sum(np.sin(2 * np.pi * pitch * h * t) / h for h in range(1, 6))
+    envelope = np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * t), 0, None)
+    samples = 0.3 * voiced * envelope + 0.01 * rng.standard_normal(len(t))
+    return dsp.array_to_segment(samples[:, None].astype(np.float32), FRAME_RATE)
+
+
+def legacy_post_process(segments, speed):
+    combined_audio = AudioSegment.empty()
+    for audio in segments:
+        combined_audio += audio
+    combined_audio = normalize(combined_audio)
+    return speedup(combined_audio, playback_speed=speed)
+
+
+def render_post_process(segments, speed):
+    arrays, frame_rate, sample_width = stretch_segments(segments, playback_speed=speed)
+    return join_segments(arrays, frame_rate, sample_width, normalization_gain(arrays, frame_rate))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--minutes", type=int, nargs="+", default=[2, 10])
+    parser.add_argument("--speed", type=float, default=1.3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'minutes':>8} {'path':>8} {'seconds':>9} {'output s':>9} {'peak dBFS':>10}")
+    for minutes in args.minutes:
+        segments = [synthetic_segment(rng) for _ in range(minutes * 60 // SEGMENT_SECONDS)]
+        for name, fn in (
+            ("numpy", lambda: render_post_process(segments, args.speed)),
+            ("pydub", lambda: legacy_post_process(segments, args.speed)),
+        ):
+            started = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - started
+            print(f"{minutes:>8} {name:>8} {elapsed:>9.2f} {len(result) / 1000:>9.1f} {result.max_dBFS:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
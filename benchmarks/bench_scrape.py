@@ -0,0 +1,98 @@
+"""
+Compare llm.parse_page modes over a corpus of saved HTML pages: the old
+full html.parser DOM against the tag-strained html.parser parse and the
+direct lxml.html walk.
+Reports time, throughput, peak Python memory and how often each mode
+extracts the same text as the full parse. Peak memory only counts
+Python allocations, so lxml's C-level tree is not included.
+
+Without --corpus, a synthetic corpus of article-like pages (navigation,
+scripts, tables and nested divs around the text) is generated.
+
+Usage: python benchmarks/bench_scrape.py [--corpus saved_pages/] [--pages 40] [--max-bytes 2097152]
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm import parse_page
+
+MODES = ["full", "html.parser", "lxml"]
+WORDS = "model data training results method learning network performance graph attention layer".split()
+
+
+def sentence(rng, words=18):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def synthetic_page(rng, sections=60):
+    nav = "".join(f'<li><a href="/p{i}">{sentence(rng, 3)}</a></li>' for i in range(80))
+    body = []
+    for i in range(sections):
+        body.append(f"<h2>{sentence(rng, 5)}</h2>")
+        body.append(f'<div class="wrap"><div class="inner"><p>{sentence(rng)} {sentence(rng)}</p></div></div>')
+        body.append("<table>" + "".join(
+            f"<tr>{''.join(f'<td>{rng.random():.4f}</td>' for _ in range(8))}</tr>" for _ in range(10)
+        ) + "</table>")
+        body.append(f"<script>var x{i} = {list(range(50))};</script>")
+    return (
+        f"<html><head><title>{sentence(rng, 6)}</title><style>{'p{margin:0}' * 200}</style></head>"
+        f"<body><nav><ul>{nav}</ul></nav><article><h1>{sentence(rng, 8)}</h1>{''.join(body)}</article></body></html>"
+    ).encode("utf-8")
+
+
+def load_corpus(corpus, pages, max_bytes):
+    if corpus:
+        paths = sorted(glob.glob(os.path.join(corpus, "**", "*.htm*"), recursive=True))
+        documents = []
+        for path in paths:
+            with open(path, "rb") as f:
+                documents.append(f.read(max_bytes))
+        return documents
+    rng = random.Random(0)
+    return [synthetic_page(rng) for _ in range(pages)]
+
+
+def run(documents, mode):
+    """Time a plain pass, then measure peak traced memory in a second pass (tracemalloc slows parsing)."""
+    started = time.perf_counter()
+    results = [parse_page(document, mode) for document in documents]
+    elapsed = time.perf_counter() - started
+    peak = 0
+    for document in documents:
+        tracemalloc.start()
+        parse_page(document, mode)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return results, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", help="directory of saved .html pages (searched recursively)")
+    parser.add_argument("--pages", type=int, default=40, help="synthetic pages when no corpus is given")
+    parser.add_argument("--max-bytes", type=int, default=2 * 1024 * 1024, help="bytes read per page, like SCRAPE_MAX_BYTES")
+    args = parser.parse_args()
+
+    documents = load_corpus(args.corpus, args.pages, args.max_bytes)
+    total_mb = sum(len(document) for document in documents) / 1e6
+    print(f"{len(documents)} pages, {total_mb:.1f} MB")
+
+    baseline = None
+    for mode in MODES:
+        results, elapsed, peak = run(documents, mode)
+        if baseline is None:
+            baseline = results
+        same = sum(result == expected for result, expected in zip(results, baseline))
+        print(f"{mode:>12}: {elapsed:6.2f}s  {total_mb / elapsed:6.1f} MB/s  "
+              f"peak/page {peak / 1e6:6.1f} MB  same text {same}/{len(documents)}")
+
+
+if __name__ == "__main__":
+    main()
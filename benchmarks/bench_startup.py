@@ -0,0 +1,70 @@
+"""
+Measure server boot cost: wall time to import app.py in a fresh
+interpreter (the per-worker cold start), the slowest modules from
+python -X importtime, and the one-off build time of each lazily
+created component.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--top 10] [--components model async_exa async_http]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+BUILD_SNIPPET = """
+import json, app, components
+print(json.dumps(components.registry.warm_up({names!r})))
+"""
+
+
+def run_python(code, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+
+
+def import_times(runs):
+    return [float(run_python(IMPORT_SNIPPET).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+
+
+def slowest_imports(top):
+    """(cumulative seconds, module) for the slowest imports, parsed from -X importtime."""
+    rows = []
+    for line in run_python("import app", "-X", "importtime").stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        rows.append((int(parts[1]) / 1e6, parts[2].rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--components", nargs="*", default=["async_http"],
+                        help="components to build after import (model and async_exa need API keys)")
+    args = parser.parse_args()
+
+    times = import_times(args.runs)
+    print(f"import app: median {statistics.median(times):.3f}s  min {min(times):.3f}s  ({args.runs} runs)")
+
+    print("\nslowest imports (cumulative):")
+    for seconds, module in slowest_imports(args.top):
+        print(f"  {seconds:7.3f}s  {module}")
+
+    if args.components:
+        output = run_python(BUILD_SNIPPET.format(names=args.components)).stdout.strip().splitlines()[-1]
+        print("\ncomponent build times:")
+        for name, seconds in json.loads(output).items():
+            print(f"  {seconds:7.3f}s  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Compare title strategies for aprocess_input side by side: the current
+full-response LLM prompt ("llm"), the titles-and-highlights prompt
+("llm_trimmed") and local keyphrase extraction ("keyphrase").
+
+For each query it reports title latency and prompt size, plus the
+overlap with the "llm" path: word overlap of the titles, or with
+--search the overlap of the top-10 papers each title retrieves.
+
+Exa results come from the live API (EXA_API_KEY) or from a fixtures file
+saved by an earlier run with --save-fixtures; the LLM strategies need a
+Gemini key.
+
+Usage: python benchmarks/bench_title.py --queries "graph neural networks for molecules" ...
+       python benchmarks/bench_title.py --fixtures titles.json [--strategies keyphrase llm_trimmed] [--search]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import components
+import tools
+from dedup import deduplicate_papers
+from keyphrases import exa_snippets
+from ranking import rank_papers
+
+STRATEGIES = ["llm", "llm_trimmed", "keyphrase"]
+
+
+async def live_fixtures(queries):
+    fixtures = []
+    for query in queries:
+        exa_results = await tools.asearch_and_contents(f"Find research papers related to: {query}.")
+        fixtures.append({
+            "query": query,
+            "exa_results": exa_results if "error" in exa_results else {
+                "results": [
+                    {"title": title, "highlights": highlights}
+                    for title, highlights in exa_snippets(exa_results)
+                ],
+                "raw": str(exa_results),
+            },
+        })
+    return fixtures
+
+
+class FixtureResults(dict):
+    """Saved Exa results whose str() is the original full response, as the "llm" prompt saw it."""
+
+    def __str__(self):
+        return self.get("raw", json.dumps(self.get("results")))
+
+
+def jaccard(a, b):
+    a, b = set(a), set(b)
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+async def top_papers(title):
+    papers, _ = await tools.afetch_remote_papers(title)
+    papers = deduplicate_papers(papers)
+    return [paper.get("arxiv_id") or paper.get("doi") or paper.get("id") for paper in rank_papers(title, papers)]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", nargs="*", default=[])
+    parser.add_argument("--fixtures", help="JSON file of saved Exa results")
+    parser.add_argument("--save-fixtures", help="write the live Exa results to this file")
+    parser.add_argument("--strategies", nargs="*", default=STRATEGIES, choices=STRATEGIES)
+    parser.add_argument("--search", action="store_true", help="compare retrieved papers instead of title words")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        with open(args.fixtures) as f:
+            fixtures = json.load(f)
+    else:
+        fixtures = await live_fixtures(args.queries)
+    if args.save_fixtures:
+        with open(args.save_fixtures, "w") as f:
+            json.dump(fixtures, f, indent=2)
+
+    latencies = {strategy: [] for strategy in args.strategies}
+    overlaps = {strategy: [] for strategy in args.strategies}
+    for fixture in fixtures:
+        exa_results = fixture["exa_results"]
+        if "results" in exa_results:
+            exa_results = FixtureResults(exa_results)
+        print(f"\n{fixture['query']}")
+        titles = {}
+        for strategy in args.strategies:
+            started = time.perf_counter()
+            try:
+                titles[strategy] = await tools.agenerate_title(exa_results, strategy) or fixture["query"]
+            except Exception as e:
+                print(f"  {strategy:>12}: failed ({e})")
+                continue
+            latencies[strategy].append(time.perf_counter() - started)
+            prompt_chars = 0 if strategy == "keyphrase" else len(tools.title_prompt(exa_results, strategy))
+            print(f"  {strategy:>12}: {latencies[strategy][-1] * 1000:8.1f} ms  prompt {prompt_chars:7d} chars  {titles[strategy]!r}")
+
+        if "llm" not in titles:
+            continue
+        reference = await top_papers(titles["llm"]) if args.search else titles["llm"].lower().split()
+        for strategy, title in titles.items():
+            if strategy == "llm":
+                continue
+            candidate = await top_papers(title) if args.search else title.lower().split()
+            overlaps[strategy].append(jaccard(reference, candidate))
+
+    print("\nsummary")
+    for strategy in args.strategies:
+        if not latencies[strategy]:
+            continue
+        line = f"  {strategy:>12}: median {statistics.median(latencies[strategy]) * 1000:8.1f} ms"
+        if overlaps[strategy]:
+            kind = "papers" if args.search else "title words"
+            line += f"  overlap with llm ({kind}) {statistics.mean(overlaps[strategy]):.2f}"
+        print(line)
+
+    if components.registry.built("async_http"):
+        await components.get("async_http").aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
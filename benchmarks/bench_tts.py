@@ -0,0 +1,89 @@
+"""
+Compare TTS backends by synthesis throughput: characters of dialogue per
+second of wall time, with the segment cache bypassed.
+
+Lines come from a podcast script (--script, the JSON the LLM produces) or
+are generated. gTTS renders them with --workers concurrent requests, one
+line each, as the renderer does; Kokoro renders them in batches of
+--batch-size on CPU. Kokoro's one-off model load is timed separately and
+left out of the throughput figure.
+
+Usage: python benchmarks/bench_tts.py [--script podcast_script.json] [--lines 40] [--backends gtts kokoro]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tts
+from audio import TTS_CONCURRENCY, collect_dialogue
+
+SPEAKERS = ["Host 1 (UK)", "Host 2 (India)"]
+WORDS = ("the model learns a compact representation of each paper and the results show "
+         "clear gains over prior methods on several benchmarks with far less training data").split()
+
+
+def script_lines(path):
+    with open(path) as f:
+        items = collect_dialogue(json.load(f))
+    return [(item["speaker"], item["dialogue"]) for item in items if item["dialogue"]]
+
+
+def synthetic_lines(count):
+    rng = random.Random(0)
+    return [
+        (SPEAKERS[i % 2], " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 40))).capitalize() + ".")
+        for i in range(count)
+    ]
+
+
+def run(backend, lines, workers):
+    texts = [text for _, text in lines]
+    voices = [backend.voice_for(speaker) for speaker, _ in lines]
+    batches = [range(start, min(start + backend.max_batch, len(lines))) for start in range(0, len(lines), backend.max_batch)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        list(executor.map(lambda batch: backend.synthesize([texts[i] for i in batch], [voices[i] for i in batch]), batches))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--script", help="podcast script JSON to read dialogue from")
+    parser.add_argument("--lines", type=int, default=40, help="generated lines when no script is given")
+    parser.add_argument("--backends", nargs="*", default=list(tts.BACKENDS), choices=list(tts.BACKENDS))
+    parser.add_argument("--workers", type=int, default=TTS_CONCURRENCY, help="concurrent gTTS requests")
+    parser.add_argument("--batch-size", type=int, default=tts.KOKORO_BATCH_SIZE, help="Kokoro lines per call")
+    args = parser.parse_args()
+
+    lines = script_lines(args.script) if args.script else synthetic_lines(args.lines)
+    chars = sum(len(text) for _, text in lines)
+    print(f"{len(lines)} lines, {chars} characters")
+
+    for name in args.backends:
+        if name == "kokoro":
+            backend = tts.KokoroBackend(max_batch=args.batch_size)
+            workers = 1
+        else:
+            backend = tts.BACKENDS[name]()
+            workers = args.workers
+        try:
+            started = time.perf_counter()
+            backend.load()
+            load_seconds = time.perf_counter() - started
+            elapsed = run(backend, lines, workers)
+        except Exception as e:
+            print(f"{name:>8}: failed ({e})")
+            continue
+        print(f"{name:>8}: load {load_seconds:6.2f}s  synth {elapsed:7.2f}s  "
+              f"{chars / elapsed:8.1f} chars/s  {len(lines) / elapsed:6.2f} lines/s  "
+              f"(batch {backend.max_batch}, workers {workers})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import os
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from ranking import tokenize
+
+COMPACT_TOKEN_BUDGET = int(os.getenv("COMPACT_TOKEN_BUDGET", "6000"))
+COMPACT_METHOD = os.getenv("COMPACT_METHOD", "textrank")
+COMPACT_MAX_TERMS = int(os.getenv("COMPACT_MAX_TERMS", "4000"))
+COMPACT_TEXTRANK_MAX_PARAGRAPHS = int(os.getenv("COMPACT_TEXTRANK_MAX_PARAGRAPHS", "2000"))
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English prose)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def is_heading(line: str) -> bool:
+    return len(line.split()) <= 12 and not line.rstrip().endswith((".", "?", "!", ":", ";", ","))
+
+
+def split_sections(content: str) -> List[Tuple[str, str]]:
+    """(heading, paragraph) pairs from newline-separated scraped text, each paragraph under its latest heading."""
+    heading = ""
+    pairs = []
+    for line in content.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        if is_heading(line):
+            heading = line
+        else:
+            pairs.append((heading, line))
+    return pairs
+
+
+def tfidf_matrix(documents: List[List[str]], max_terms: int = COMPACT_MAX_TERMS) -> np.ndarray:
+    """L2-normalized TF-IDF rows over the max_terms terms found in the most documents."""
+    df = Counter(term for document in documents for term in set(document))
+    vocabulary = {term: i for i, (term, _) in enumerate(df.most_common(max_terms))}
+    matrix = np.zeros((len(documents), len(vocabulary)))
+    for row, document in enumerate(documents):
+        for term, count in Counter(document).items():
+            if term in vocabulary:
+                matrix[row, vocabulary[term]] = count
+    idf = np.log((1 + len(documents)) / (1 + np.array([df[term] for term in vocabulary]))) + 1
+    matrix = np.log1p(matrix) * idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1)
+
+
+def textrank(matrix: np.ndarray, damping: float = 0.85, iterations: int = 50, tolerance: float = 1e-6) -> np.ndarray:
+    """PageRank over the cosine-similarity graph of the rows."""
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, out_weight, out=np.full_like(similarity, 1 / len(matrix)), where=out_weight > 0)
+    scores = np.full(len(matrix), 1 / len(matrix))
+    for _ in range(iterations):
+        updated = (1 - damping) / len(matrix) + damping * transition.T @ scores
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+
+def salience(paragraphs: List[str], method: str = COMPACT_METHOD) -> np.ndarray:
+    """
+    Salience of each paragraph: TextRank centrality, or for "tfidf" (and
+    documents too long for a dense similarity graph) cosine similarity to
+    the document's TF-IDF centroid.
+    """
+    matrix = tfidf_matrix([tokenize(paragraph) for paragraph in paragraphs])
+    if method == "textrank" and len(paragraphs) <= COMPACT_TEXTRANK_MAX_PARAGRAPHS:
+        return textrank(matrix)
+    centroid = matrix.mean(axis=0)
+    return matrix @ (centroid / max(np.linalg.norm(centroid), 1e-12))
+
+
+def compact(content: str, budget: int = COMPACT_TOKEN_BUDGET, method: str = COMPACT_METHOD) -> Tuple[str, Dict[str, Any]]:
+    """
+    Keep the most salient paragraphs that fit in budget tokens, in their
+    original order and under their section headings. Content already
+    within budget is returned unchanged.
+    """
+    before = estimate_tokens(content)
+    pairs = split_sections(content) or [("", line.strip()) for line in content.split("\n") if line.strip()]
+    if before <= budget or method == "off" or not pairs:
+        return content, {"tokens_before": before, "tokens_after": before,
+                         "paragraphs": len(pairs), "paragraphs_kept": len(pairs)}
+
+    scores = salience([paragraph for _, paragraph in pairs], method)
+    chosen = set()
+    headings = set()
+    used = 0
+    for index in np.argsort(-scores, kind="stable"):
+        heading, paragraph = pairs[index]
+        cost = estimate_tokens(paragraph) + 1
+        if heading and heading not in headings:
+            cost += estimate_tokens(heading) + 1
+        if used + cost > budget:
+            continue
+        chosen.add(int(index))
+        if heading:
+            headings.add(heading)
+        used += cost
+    if not chosen:
+        top = int(np.argmax(scores))
+        pairs[top] = ("", pairs[top][1][:budget * CHARS_PER_TOKEN])
+        chosen.add(top)
+
+    lines = []
+    last_heading = None
+    for index in sorted(chosen):
+        heading, paragraph = pairs[index]
+        if heading and heading != last_heading:
+            lines.append(heading)
+            last_heading = heading
+        lines.append(paragraph)
+    compacted = "\n".join(lines)
+    return compacted, {"tokens_before": before, "tokens_after": estimate_tokens(compacted),
+                       "paragraphs": len(pairs), "paragraphs_kept": len(chosen)}
+
+
+class CompactionStats:
+    """Running prompt-size totals for compacted content, reported under /metrics."""
+
+    def __init__(self):
+        self.documents = 0
+        self.compacted = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.last = None
+        self._lock = threading.Lock()
+
+    def record(self, stats: Dict[str, Any]) -> None:
+        with self._lock:
+            self.documents += 1
+            self.compacted += stats["tokens_after"] < stats["tokens_before"]
+            self.tokens_before += stats["tokens_before"]
+            self.tokens_after += stats["tokens_after"]
+            self.last = stats
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "budget": COMPACT_TOKEN_BUDGET,
+                "method": COMPACT_METHOD,
+                "documents": self.documents,
+                "compacted": self.compacted,
+                "tokens_before": self.tokens_before,
+                "tokens_after": self.tokens_after,
+                "reduction": 1 - self.tokens_after / self.tokens_before if self.tokens_before else 0.0,
+                "last": self.last,
+            }
+
+
+compaction_stats = CompactionStats()
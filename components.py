@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Union
+
+MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+WARM_UP_COMPONENTS = os.getenv("WARM_UP_COMPONENTS", "")
+
+
+class Registry:
+    """
+    Process-wide components built once, on first use, and shared by every
+    module. Factories are registered by name and run under a per-name lock,
+    so concurrent first calls still build a single instance.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._locks = {}
+        self._build_seconds = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        with self._lock:
+            self._factories[name] = factory
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Any:
+        if name in self._instances:
+            return self._instances[name]
+        with self._lock:
+            if name not in self._factories:
+                raise KeyError(f"Unknown component: {name}")
+            lock = self._locks[name]
+        with lock:
+            if name not in self._instances:
+                started = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                self._build_seconds[name] = time.perf_counter() - started
+        return self._instances[name]
+
+    def built(self, name: str) -> bool:
+        return name in self._instances
+
+    def warm_up(self, names: Union[Iterable[str], None] = None) -> Dict[str, float]:
+        """Build the named components (all registered ones by default) and return their build times."""
+        for name in list(names if names is not None else self._factories):
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Warm-up of {name} failed: {e}")
+        return dict(self._build_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            names = list(self._factories)
+        return {
+            name: {"built": name in self._instances, "build_seconds": self._build_seconds.get(name)}
+            for name in names
+        }
+
+
+registry = Registry()
+
+
+def get(name: str) -> Any:
+    return registry.get(name)
+
+
+def create_model():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(model=MODEL_NAME)
+
+
+def create_async_exa():
+    from exa_py import AsyncExa
+    api_key = os.getenv("EXA_API_KEY")
+    return AsyncExa(api_key=api_key) if api_key else None
+
+
+def create_async_http():
+    import http_client
+    return http_client.AsyncPooledClient()
+
+
+def create_tts():
+    import tts
+    return tts.create_backend()
+
+
+registry.register("model", create_model)
+registry.register("async_exa", create_async_exa)
+registry.register("async_http", create_async_http)
+registry.register("tts", create_tts)
+
+
+def warm_up_from_env() -> None:
+    """Build the components listed in WARM_UP_COMPONENTS ("all" for every registered one)."""
+    if not WARM_UP_COMPONENTS:
+        return
+    names = None if WARM_UP_COMPONENTS == "all" else [name.strip() for name in WARM_UP_COMPONENTS.split(",") if name.strip()]
+    build_seconds = registry.warm_up(names)
+    print("Warmed up " + ", ".join(f"{name} ({seconds:.2f}s)" for name, seconds in build_seconds.items()))
@@ -0,0 +1,160 @@
+import os
+import re
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+from script_cache import parse_arxiv_id
+
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+DEDUP_MAX_CANDIDATES = int(os.getenv("DEDUP_MAX_CANDIDATES", "8"))
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(1, 1 << 31, size=DEDUP_NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 31, size=DEDUP_NUM_PERM, dtype=np.uint64)
+
+
+def title_fingerprint(title: str) -> str:
+    """Lower-cased title with punctuation removed and whitespace collapsed."""
+    return " ".join(re.sub(r"[^\w\s]", " ", (title or "").lower()).split())
+
+
+def external_ids(paper: Dict[str, Any]) -> Dict[str, Union[str, None]]:
+    """Version-less arXiv ID and lower-cased DOI from whichever raw source fields carry them."""
+    ids = paper.get("externalIds") or {}
+    arxiv_id = ids.get("ArXiv") or paper.get("arxiv_id")
+    if not arxiv_id:
+        for url in (paper.get("pdf_url"), paper.get("url")):
+            arxiv_id = parse_arxiv_id(url or "")
+            if arxiv_id:
+                break
+    if arxiv_id:
+        arxiv_id = re.sub(r"v\d+$", "", arxiv_id)
+    doi = ids.get("DOI") or paper.get("doi")
+    return {"arxiv_id": arxiv_id or None, "doi": doi.lower() if doi else None}
+
+
+def shingles(fingerprint: str, size: int = 3) -> np.ndarray:
+    """Hashed character shingles of a title fingerprint."""
+    text = f" {fingerprint} "
+    grams = {text[i:i + size] for i in range(max(len(text) - size + 1, 1))}
+    return np.array([zlib.crc32(gram.encode("utf-8")) for gram in grams], dtype=np.uint64)
+
+
+def minhash(hashes: np.ndarray) -> np.ndarray:
+    """MinHash signature of a set of shingle hashes, all permutations at once."""
+    return ((hashes[:, None] * _PERM_A[None, :] + _PERM_B[None, :]) % _MERSENNE_PRIME).min(axis=0)
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / max(len(a | b), 1)
+
+
+def paper_year(paper: Dict[str, Any]) -> Union[int, None]:
+    """Publication year from "year" or an ISO "published" date, if either is set."""
+    match = re.match(r"\d{4}", str(paper.get("year") or paper.get("published") or ""))
+    return int(match.group()) if match else None
+
+
+def conflicting(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    """Whether two records carry different arXiv IDs, DOIs or years, so they cannot be one paper."""
+    return any(a[key] and b[key] and a[key] != b[key] for key in ("arxiv_id", "doi", "year"))
+
+
+def merge_records(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Keep the first record and fill its empty fields from the duplicates.
+    sources lists every source of the group, including those of records
+    merged by an earlier pass.
+    """
+    merged = dict(records[0])
+    for record in records[1:]:
+        for key, value in record.items():
+            if value in (None, "", [], {}) or key in ("source", "sources"):
+                continue
+            if merged.get(key) in (None, "", [], {}, 0, "No abstract available"):
+                merged[key] = value
+            elif key == "categories":
+                merged[key] = list(dict.fromkeys([*merged[key], *value]))
+            elif key == "citationCount":
+                merged[key] = max(merged[key] or 0, value)
+    merged["sources"] = list(dict.fromkeys(
+        source for record in records for source in record.get("sources") or [record.get("source", "unknown")]
+    ))
+    return merged
+
+
+def deduplicate_papers(papers: List[Dict[str, Any]], threshold: float = DEDUP_THRESHOLD,
+                       max_candidates: int = DEDUP_MAX_CANDIDATES) -> List[Dict[str, Any]]:
+    """
+    Collapse records that refer to the same paper: shared source id, arXiv
+    ID or DOI, identical title fingerprint, or near-identical titles found
+    through MinHash LSH buckets. Near-identical titles must also have the
+    same number of words, so "Attention Is All You Need" and "Attention
+    Is Almost All You Need" or a title and its "...: A Survey" stay apart,
+    and records whose arXiv IDs, DOIs or years conflict are never merged
+    on title similarity alone. Within a bucket each title is only
+    checked against the previous max_candidates titles, so a crowded
+    bucket cannot turn the pass quadratic. Duplicates are merged into the
+    first record of each group, keeping the original order.
+    """
+    parent = list(range(len(papers)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    first_seen = {}
+    fingerprints = []
+    identities = []
+    for i, paper in enumerate(papers):
+        fingerprint = title_fingerprint(paper.get("title", ""))
+        fingerprints.append(fingerprint)
+        ids = external_ids(paper)
+        identities.append({**ids, "year": paper_year(paper)})
+        keys = [f"id:{paper.get('source')}:{paper.get('id')}" if paper.get("id") else None,
+                f"arxiv:{ids['arxiv_id']}" if ids["arxiv_id"] else None,
+                f"doi:{ids['doi']}" if ids["doi"] else None,
+                f"title:{fingerprint}" if fingerprint else None]
+        for key in filter(None, keys):
+            if key in first_seen:
+                union(first_seen[key], i)
+            else:
+                first_seen[key] = i
+
+    rows = DEDUP_NUM_PERM // DEDUP_BANDS
+    buckets = defaultdict(list)
+    shingle_sets = {}
+    for i, fingerprint in enumerate(fingerprints):
+        if not fingerprint:
+            continue
+        hashes = shingles(fingerprint)
+        shingle_sets[i] = set(hashes.tolist())
+        signature = minhash(hashes)
+        for band in range(DEDUP_BANDS):
+            buckets[(band, signature[band * rows:(band + 1) * rows].tobytes())].append(i)
+    for members in buckets.values():
+        for position, i in enumerate(members):
+            for j in members[position + 1:position + 1 + max_candidates]:
+                if (find(i) != find(j)
+                        and len(fingerprints[i].split()) == len(fingerprints[j].split())
+                        and not conflicting(identities[i], identities[j])
+                        and jaccard(shingle_sets[i], shingle_sets[j]) >= threshold):
+                    union(i, j)
+
+    groups = defaultdict(list)
+    for i in range(len(papers)):
+        groups[find(i)].append(papers[i])
+    return [merge_records(groups[root]) for root in sorted(groups)]
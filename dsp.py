@@ -0,0 +1,140 @@
+import numpy as np
+from pydub import AudioSegment
+
+
+def segment_to_array(audio):
+    """Convert an AudioSegment to a float32 array of shape (frames, channels) in [-1, 1]."""
+    samples = np.array(audio.get_array_of_samples(), dtype=np.float32)
+    samples /= float(1 << (8 * audio.sample_width - 1))
+    return samples.reshape(-1, audio.channels)
+
+
+def array_to_segment(samples, frame_rate, sample_width=2):
+    """Convert a (frames, channels) float array back to an AudioSegment."""
+    samples = np.atleast_2d(samples.T).T
+    scale = float(1 << (8 * sample_width - 1))
+    dtype = {1: np.int8, 2: np.int16, 4: np.int32}[sample_width]
+    pcm = np.clip(np.round(samples * scale), -scale, scale - 1).astype(dtype)
+    return AudioSegment(
+        data=pcm.tobytes(), sample_width=sample_width, frame_rate=frame_rate, channels=samples.shape[1]
+    )
+
+
+def time_stretch(samples, frame_rate, rate, frame_ms=40, tolerance_ms=10):
+    """
+    WSOLA time-stretch: rate > 1 speeds speech up without changing pitch.
+
+    Each output frame is taken from around its ideal input position, shifted
+    by up to tolerance_ms to best match the natural continuation of the
+    previously chosen frame. The alignment search is one FFT correlation per
+    frame and the overlap-add is done for all frames at once.
+    """
+    samples = np.atleast_2d(samples.T).T.astype(np.float32, copy=False)
+    if rate == 1 or len(samples) == 0:
+        return samples.copy()
+    frame_length = max(2 * int(frame_rate * frame_ms / 2000), 4)
+    hop = frame_length // 2
+    tolerance = int(frame_rate * tolerance_ms / 1000)
+    output_length = int(round(len(samples) / rate))
+    n_frames = int(np.ceil(output_length / hop))
+    channels = samples.shape[1]
+
+    pad = tolerance + hop
+    padded = np.pad(samples, ((pad, int(hop * rate) + frame_length + pad), (0, 0)))
+    padded_mono = padded.mean(axis=1)
+    ideal = np.round(np.arange(n_frames) * hop * rate).astype(np.int64) + pad
+
+    search_length = frame_length + 2 * tolerance
+    fft_length = 1 << int(np.ceil(np.log2(search_length + frame_length)))
+    positions = ideal.copy()
+    for k in range(1, n_frames):
+        continuation = positions[k - 1] + hop
+        template = np.fft.rfft(padded_mono[continuation:continuation + frame_length], fft_length)
+        region_start = ideal[k] - tolerance
+        region = np.fft.rfft(padded_mono[region_start:region_start + search_length], fft_length)
+        correlation = np.fft.irfft(region * np.conj(template), fft_length)[:2 * tolerance + 1]
+        positions[k] = region_start + int(np.argmax(correlation))
+
+    window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frame_length) / frame_length)).astype(np.float32)
+    frames = padded[positions[:, None] + np.arange(frame_length)] * window[None, :, None]
+    # Periodic Hann windows at 50% overlap sum to one, so no gain correction is needed.
+    blocks = np.zeros((n_frames + 1, hop, channels), dtype=np.float32)
+    blocks[:-1] += frames[:, :hop]
+    blocks[1:] += frames[:, hop:]
+    return blocks.reshape(-1, channels)[:output_length]
+
+
+def peak(samples):
+    return float(np.max(np.abs(samples))) if samples.size else 0.0
+
+
+def peak_gain(peak_value, headroom_db=0.1):
+    """Linear gain that brings peak_value to headroom_db below full scale, like pydub.effects.normalize."""
+    if peak_value <= 0:
+        return 1.0
+    return 10 ** (-headroom_db / 20) / peak_value
+
+
+def _biquad(b, a, samples):
+    from scipy.signal import lfilter
+    return lfilter(np.asarray(b) / a[0], np.asarray(a) / a[0], samples, axis=0)
+
+
+def k_weight(samples, frame_rate):
+    """Apply the ITU-R BS.1770 K-weighting pre-filter (high shelf + high pass)."""
+    w0 = 2 * np.pi * 1681.974450955533 / frame_rate
+    gain = 10 ** (3.999843853973347 / 40)
+    alpha = np.sin(w0) / (2 * 0.7071752369554196)
+    cos_w0 = np.cos(w0)
+    root = 2 * np.sqrt(gain) * alpha
+    shelf_b = [
+        gain * ((gain + 1) + (gain - 1) * cos_w0 + root),
+        -2 * gain * ((gain - 1) + (gain + 1) * cos_w0),
+        gain * ((gain + 1) + (gain - 1) * cos_w0 - root),
+    ]
+    shelf_a = [
+        (gain + 1) - (gain - 1) * cos_w0 + root,
+        2 * ((gain - 1) - (gain + 1) * cos_w0),
+        (gain + 1) - (gain - 1) * cos_w0 - root,
+    ]
+    w0 = 2 * np.pi * 38.13547087602444 / frame_rate
+    alpha = np.sin(w0) / (2 * 0.5003270373238773)
+    cos_w0 = np.cos(w0)
+    pass_b = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2]
+    pass_a = [1 + alpha, -2 * cos_w0, 1 - alpha]
+    return _biquad(pass_b, pass_a, _biquad(shelf_b, shelf_a, samples))
+
+
+def loudness_blocks(samples, frame_rate):
+    """Mean-square energy of the 400 ms, 75%-overlap gating blocks of a segment, summed over channels."""
+    weighted = k_weight(np.atleast_2d(samples.T).T, frame_rate)
+    block = int(0.4 * frame_rate)
+    step = block // 4
+    if len(weighted) < block:
+        return np.zeros(0)
+    energy = np.concatenate([np.zeros((1, weighted.shape[1])), np.cumsum(weighted ** 2, axis=0)])
+    starts = np.arange(0, len(weighted) - block + 1, step)
+    return ((energy[starts + block] - energy[starts]) / block).sum(axis=1)
+
+
+def integrated_loudness(blocks):
+    """Gated integrated loudness in LUFS from loudness_blocks output (possibly from many segments)."""
+    blocks = np.asarray(blocks)
+    blocks = blocks[blocks > 0]
+    if blocks.size == 0:
+        return float("-inf")
+    loudness = -0.691 + 10 * np.log10(blocks)
+    gated = blocks[loudness > -70]
+    if gated.size == 0:
+        return float("-inf")
+    relative_gate = -0.691 + 10 * np.log10(gated.mean()) - 10
+    gated = gated[-0.691 + 10 * np.log10(gated) > relative_gate]
+    return float(-0.691 + 10 * np.log10(gated.mean())) if gated.size else float("-inf")
+
+
+def loudness_gain(blocks, target_lufs=-16.0):
+    """Linear gain that brings the gated loudness of blocks to target_lufs."""
+    loudness = integrated_loudness(blocks)
+    if not np.isfinite(loudness):
+        return 1.0
+    return 10 ** ((target_lufs - loudness) / 20)
@@ -0,0 +1,229 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Union
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "4"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "1.0"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "30"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+HTTP_HOST_CONCURRENCY = int(os.getenv("HTTP_HOST_CONCURRENCY", "8"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Allows rate requests per second on average, with bursts of up to burst requests."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token now, possibly on credit, and return how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate) - 1
+            self.updated = now
+            return max(-self.tokens / self.rate, 0.0)
+
+    def refund(self) -> None:
+        """Return a reserved token that was never used, e.g. by a request cancelled while it waited."""
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + 1)
+
+    def acquire(self) -> float:
+        """Block until a token is available and return how long that took."""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+class HostPolicy:
+    """Rate limit and concurrency cap shared by every request to one host."""
+
+    def __init__(self, rate: Union[float, None] = None, burst: int = 1, concurrency: int = HTTP_HOST_CONCURRENCY):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.concurrency = concurrency
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.async_slots = None
+        self.requests = 0
+        self.retries = 0
+        self.throttled_seconds = 0.0
+
+
+# arXiv asks for at most one request every three seconds over a single connection.
+# Semantic Scholar allows one request per second per API key.
+HOST_POLICIES = {
+    "export.arxiv.org": HostPolicy(rate=1 / float(os.getenv("ARXIV_REQUEST_INTERVAL", "3")), concurrency=1),
+    "api.semanticscholar.org": HostPolicy(rate=float(os.getenv("SEMANTIC_SCHOLAR_RPS", "1")), concurrency=1),
+}
+
+
+def retry_delay(attempt: int, response: Union[requests.Response, None] = None) -> float:
+    """Retry-After when the server sent one, otherwise full-jitter exponential backoff."""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), HTTP_BACKOFF_MAX)
+        except ValueError:
+            try:
+                return min(max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0), HTTP_BACKOFF_MAX)
+            except (TypeError, ValueError):
+                pass
+    return random.uniform(0, min(HTTP_BACKOFF * 2 ** attempt, HTTP_BACKOFF_MAX))
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session with keep-alive connection pools, a default timeout,
+    per-host rate limits and concurrency caps, and jittered exponential
+    backoff on connection errors, 429 and 5xx responses.
+    """
+
+    def __init__(self, retries: int = HTTP_RETRIES, timeout: float = HTTP_TIMEOUT):
+        super().__init__()
+        self.retries = retries
+        self.timeout = timeout
+        self._policies_lock = threading.Lock()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def policy(self, url: str) -> HostPolicy:
+        host = urlsplit(url).hostname or ""
+        with self._policies_lock:
+            if host not in HOST_POLICIES:
+                HOST_POLICIES[host] = HostPolicy()
+            return HOST_POLICIES[host]
+
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        policy = self.policy(url)
+        attempt = 0
+        while True:
+            with policy.slots:
+                if policy.bucket:
+                    policy.throttled_seconds += policy.bucket.acquire()
+                policy.requests += 1
+                try:
+                    response = super().request(method, url, *args, **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    if attempt >= self.retries:
+                        raise
+                    response = None
+            if response is not None and (response.status_code not in RETRY_STATUSES or attempt >= self.retries):
+                return response
+            delay = retry_delay(attempt, response)
+            status = response.status_code if response is not None else "connection error"
+            print(f"Retrying {method} {url} after {status} in {delay:.1f}s")
+            if response is not None:
+                response.close()
+            policy.retries += 1
+            attempt += 1
+            time.sleep(delay)
+
+
+class AsyncPooledClient:
+    """
+    httpx.AsyncClient counterpart of PooledSession for the event loop: it
+    shares the per-host rate limits with the threaded session, caps
+    in-flight requests per host with asyncio semaphores and retries with
+    the same backoff.
+    """
+
+    def __init__(self, retries: int = HTTP_RETRIES, timeout: float = HTTP_TIMEOUT):
+        self.retries = retries
+        self.client = httpx.AsyncClient(
+            timeout=timeout, follow_redirects=True,
+            limits=httpx.Limits(max_connections=HTTP_POOL_SIZE * 4, max_keepalive_connections=HTTP_POOL_SIZE),
+        )
+
+    def policy(self, url: str) -> HostPolicy:
+        policy = session.policy(url)
+        if policy.async_slots is None:
+            policy.async_slots = asyncio.Semaphore(policy.concurrency)
+        return policy
+
+    @staticmethod
+    async def _throttle(policy: HostPolicy) -> None:
+        """
+        Wait for the host's rate limit. A caller cancelled while waiting
+        (a source past its deadline in afan_out) gives its token back, so
+        abandoned calls do not push later requests further out.
+        """
+        if not policy.bucket:
+            return
+        delay = policy.bucket.reserve()
+        policy.throttled_seconds += delay
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            policy.bucket.refund()
+            raise
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        policy = self.policy(url)
+        attempt = 0
+        while True:
+            async with policy.async_slots:
+                await self._throttle(policy)
+                policy.requests += 1
+                try:
+                    response = await self.client.request(method, url, **kwargs)
+                except (httpx.TransportError, httpx.TimeoutException):
+                    if attempt >= self.retries:
+                        raise
+                    response = None
+            if response is not None and (response.status_code not in RETRY_STATUSES or attempt >= self.retries):
+                return response
+            delay = retry_delay(attempt, response)
+            status = response.status_code if response is not None else "connection error"
+            print(f"Retrying {method} {url} after {status} in {delay:.1f}s")
+            policy.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """Streamed request under the host's rate limit and concurrency cap (no retries: the body is read lazily)."""
+        policy = self.policy(url)
+        async with policy.async_slots:
+            await self._throttle(policy)
+            policy.requests += 1
+            async with self.client.stream(method, url, **kwargs) as response:
+                yield response
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        host: {
+            "requests": policy.requests,
+            "retries": policy.retries,
+            "throttled_seconds": round(policy.throttled_seconds, 3),
+        }
+        for host, policy in list(HOST_POLICIES.items())
+    }
+
+
+session = PooledSession()
+
@@ -0,0 +1,347 @@
+import asyncio
+import json
+import os
+import re
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+from script_cache import canonical_paper_key
+
+JOBS_DB = os.getenv("JOBS_DB", "jobs.db")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+PODCAST_DIR = os.getenv("PODCAST_DIR", "podcasts")
+STREAM_POLL_INTERVAL = float(os.getenv("STREAM_POLL_INTERVAL", "0.5"))
+SCRIPT_STREAMING = os.getenv("SCRIPT_STREAMING", "1") != "0"
+JOB_LEASE = float(os.getenv("JOB_LEASE", "60"))
+SECTION_RETENTION = float(os.getenv("SECTION_RETENTION", "300"))
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+JOB_FIELDS = ["id", "url", "paper_key", "status", "stage", "progress", "error", "output_path", "created_at", "updated_at"]
+
+
+class JobStore:
+    """SQLite-backed podcast job records, so job state survives restarts."""
+
+    def __init__(self, path: str = JOBS_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    progress REAL DEFAULT 0,
+                    error TEXT,
+                    output_path TEXT,
+                    created_at REAL,
+                    updated_at REAL
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "paper_key" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN paper_key TEXT")
+            if "owner" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_paper_key ON jobs (paper_key, status)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def create(self, url: str, paper_key: Union[str, None] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        The paper's oldest queued or running job and False, or a new queued
+        job and True. The check and insert share one write transaction, so
+        concurrent processes on the same database cannot both create a job.
+        """
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex, "url": url, "paper_key": paper_key, "status": "queued", "stage": None, "progress": 0.0,
+            "error": None, "output_path": None, "created_at": now, "updated_at": now,
+        }
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if paper_key:
+                row = conn.execute(
+                    f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE paper_key = ? AND status IN ('queued', 'running') "
+                    "ORDER BY created_at LIMIT 1",
+                    (paper_key,),
+                ).fetchone()
+                if row:
+                    return dict(zip(JOB_FIELDS, row)), False
+            conn.execute(
+                f"INSERT INTO jobs ({', '.join(JOB_FIELDS)}) VALUES ({', '.join('?' * len(JOB_FIELDS))})",
+                [job[field] for field in JOB_FIELDS],
+            )
+        return job, True
+
+    def claim(self, job_id: str, owner: str) -> bool:
+        """Atomically move a queued job to running under owner; False if another worker got it first."""
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, heartbeat_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (owner, now, now, job_id),
+            )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, owner: str) -> None:
+        """Renew the lease on every job owner is running."""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status = 'running'", (time.time(), owner))
+
+    def requeue_stale(self, lease: float = JOB_LEASE) -> int:
+        """Queue running jobs again whose owner stopped renewing its lease, e.g. a worker that died."""
+        with self._lock, closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, progress = 0 "
+                "WHERE status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (time.time() - lease,),
+            )
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> Union[Dict[str, Any], None]:
+        with self._lock, closing(self._connect()) as conn:
+            row = conn.execute(f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(zip(JOB_FIELDS, row)) if row else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", [*fields.values(), job_id])
+
+    def queued(self) -> List[Dict[str, Any]]:
+        with self._lock, closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE status = 'queued' ORDER BY created_at"
+            ).fetchall()
+        return [dict(zip(JOB_FIELDS, row)) for row in rows]
+
+
+class JobQueue:
+    """
+    Bounded worker pool that runs podcast jobs recorded in a JobStore.
+
+    Submissions are coalesced by canonical paper key: while a job for the
+    same paper is queued or running, submit returns that job instead of
+    starting another generation and render. Several processes (e.g.
+    uvicorn workers) can share one store: a job only runs in the process
+    that claims it, and running jobs keep a lease that a heartbeat thread
+    renews, so resume only picks up jobs whose owner has gone away.
+    """
+
+    def __init__(self, store: JobStore, runner: Callable[[Dict[str, Any], Callable[..., None]], str],
+                 max_workers: int = JOB_WORKERS, lease: float = JOB_LEASE):
+        self.store = store
+        self.runner = runner
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="podcast-job")
+        self.coalesced = 0
+        self._stopped = threading.Event()
+        self._heartbeat = threading.Thread(target=self._renew_leases, name="podcast-job-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def submit(self, url: str) -> Dict[str, Any]:
+        job, created = self.store.create(url, canonical_paper_key(url))
+        if not created:
+            self.coalesced += 1
+            return job
+        self.executor.submit(self._run, job)
+        return job
+
+    def resume(self) -> int:
+        """
+        Re-enqueue queued jobs and running jobs whose lease expired. Every
+        process may offer the same jobs; each runs only where it is claimed.
+        """
+        self.store.requeue_stale(self.lease)
+        jobs = self.store.queued()
+        for job in jobs:
+            self.executor.submit(self._run, job)
+        if jobs:
+            print(f"Resumed {len(jobs)} unfinished podcast jobs")
+        return len(jobs)
+
+    def _renew_leases(self) -> None:
+        while not self._stopped.wait(self.lease / 3):
+            try:
+                self.store.heartbeat(self.owner)
+            except sqlite3.Error as e:
+                print(f"Error renewing podcast job leases: {e}")
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        if not self.store.claim(job_id, self.owner):
+            return
+
+        def report(stage: str, progress: float) -> None:
+            self.store.update(job_id, stage=stage, progress=round(progress, 3))
+
+        try:
+            output_path = self.runner(job, report)
+            self.store.update(job_id, status="completed", stage="done", progress=1.0, output_path=output_path)
+        except Exception as e:
+            print(f"Podcast job {job_id} failed: {e}")
+            self.store.update(job_id, status="failed", error=str(e))
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def section_dir(job_id: str) -> str:
+    return os.path.join(PODCAST_DIR, job_id)
+
+
+def read_manifest(job_id: str) -> Dict[str, Any]:
+    """Sections of a job's audio that are ready to stream, in playback order."""
+    try:
+        with open(os.path.join(section_dir(job_id), "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"sections": [], "complete": False}
+
+
+def write_manifest(job_id: str, manifest: Dict[str, Any]) -> None:
+    path = os.path.join(section_dir(job_id), "manifest.json")
+    with open(f"{path}.part", "w") as f:
+        json.dump(manifest, f)
+    os.replace(f"{path}.part", path)
+
+
+_open_streams = {}
+_open_streams_lock = threading.Lock()
+
+
+def _stream_opened(job_id: str, delta: int) -> None:
+    with _open_streams_lock:
+        count = _open_streams.get(job_id, 0) + delta
+        if count > 0:
+            _open_streams[job_id] = count
+        else:
+            _open_streams.pop(job_id, None)
+
+
+async def stream_sections(store: JobStore, job_id: str, poll_interval: float = STREAM_POLL_INTERVAL):
+    """
+    Yield the job's mp3 section chunks as they are rendered, waiting for
+    later sections until the job completes or fails. File and database
+    reads run in worker threads, so a listener holds no thread while it
+    waits; while it is open the job's sections are not pruned.
+    """
+    _stream_opened(job_id, 1)
+    try:
+        sent = 0
+        while True:
+            manifest = await asyncio.to_thread(read_manifest, job_id)
+            for section in manifest["sections"][sent:]:
+                try:
+                    f = await asyncio.to_thread(open, os.path.join(section_dir(job_id), section["file"]), "rb")
+                except FileNotFoundError:
+                    return
+                with f:
+                    while chunk := await asyncio.to_thread(f.read, 64 * 1024):
+                        yield chunk
+                sent += 1
+            if manifest["complete"]:
+                return
+            job = await asyncio.to_thread(store.get, job_id)
+            if not job or job["status"] == "failed":
+                return
+            if job["status"] == "completed" and sent == len((await asyncio.to_thread(read_manifest, job_id))["sections"]):
+                return
+            await asyncio.sleep(poll_interval)
+    finally:
+        _stream_opened(job_id, -1)
+
+
+def prune_sections(store: JobStore, retention: float = SECTION_RETENTION) -> int:
+    """
+    Delete the streamed section files of jobs that finished more than
+    retention seconds ago (or no longer exist) and have no stream open in
+    this process; the full episode stays in PODCAST_DIR. Returns the
+    number of directories removed.
+    """
+    removed = 0
+    try:
+        names = os.listdir(PODCAST_DIR)
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        if not JOB_ID_PATTERN.match(name) or not os.path.isdir(section_dir(name)):
+            continue
+        job = store.get(name)
+        if job and (job["status"] not in ("completed", "failed") or time.time() - job["updated_at"] < retention):
+            continue
+        with _open_streams_lock:
+            if name in _open_streams:
+                continue
+        shutil.rmtree(section_dir(name), ignore_errors=True)
+        removed += 1
+    return removed
+
+
+def run_podcast_job(job: Dict[str, Any], report: Callable[[str, float], None]) -> str:
+    """
+    Generate the script for job["url"], render it to audio and return the
+    content-addressed output path. With SCRIPT_STREAMING, dialogue synthesis starts on each
+    section as soon as the model has finished writing it.
+    """
+    from llm import process_url
+    from audio import SECTIONS, PodcastRenderer, export_stream_chunk
+    from media import prerender_profiles
+
+    os.makedirs(section_dir(job["id"]), exist_ok=True)
+    manifest = {"sections": [], "complete": False}
+    write_manifest(job["id"], manifest)
+
+    def publish_section(section_key, audio):
+        file_name = f"{len(manifest['sections']):02d}_{section_key}.mp3"
+        export_stream_chunk(audio, os.path.join(section_dir(job["id"]), file_name))
+        manifest["sections"].append({"section": section_key, "file": file_name})
+        write_manifest(job["id"], manifest)
+
+    def add_to_renderer(section_key, index, value):
+        if index is None:
+            renderer.add_section(section_key, value)
+        else:
+            renderer.add_block(section_key, index, value)
+
+    renderer = PodcastRenderer(
+        progress_callback=lambda done, total: report("audio", 0.1 + 0.8 * done / max(total, 1)),
+        section_callback=publish_section,
+    )
+    report("script", 0.0)
+    try:
+        script = process_url(job["url"], on_section=add_to_renderer if SCRIPT_STREAMING else None)
+        try:
+            podcast_data = json.loads(script)
+        except json.JSONDecodeError:
+            raise ValueError(script if script.startswith("Error") else "Podcast script was not valid JSON")
+        for section_key in SECTIONS:
+            renderer.add_section(section_key, podcast_data.get(section_key))
+        output_path = renderer.finish(PODCAST_DIR)
+    except BaseException:
+        renderer.cancel()
+        raise
+    finally:
+        manifest["complete"] = True
+        write_manifest(job["id"], manifest)
+    if not output_path:
+        raise RuntimeError("Audio rendering produced no output")
+    prerender_profiles(output_path)
+    return output_path
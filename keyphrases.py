@@ -0,0 +1,94 @@
+import re
+from collections import defaultdict
+from typing import Any, List, Tuple
+
+from ranking import STOPWORDS
+
+PHRASE_STOPWORDS = STOPWORDS | {
+    "about", "after", "all", "also", "based", "been", "between", "both", "but", "do", "does", "each", "has",
+    "have", "how", "i", "if", "more", "most", "new", "not", "one", "other", "over", "paper", "papers", "such",
+    "than", "their", "them", "these", "they", "through", "two", "us", "was", "were", "what", "when", "which",
+    "while", "who", "will", "you", "your", "abstract", "arxiv", "pdf", "html", "et", "al", "research",
+}
+WORD_PATTERN = re.compile(r"[a-z][a-z0-9\-]*")
+PHRASE_BREAK_PATTERN = re.compile(r"[^\w\s\-]")
+
+
+def exa_snippets(exa_results: Any) -> List[Tuple[str, List[str]]]:
+    """(title, highlights) of each Exa result, without the page texts."""
+    response = exa_results.get("results") if isinstance(exa_results, dict) else exa_results
+    items = getattr(response, "results", response) or []
+    snippets = []
+    for item in items:
+        title = item.get("title") if isinstance(item, dict) else getattr(item, "title", None)
+        highlights = item.get("highlights") if isinstance(item, dict) else getattr(item, "highlights", None)
+        snippets.append((title or "", [highlight for highlight in highlights or [] if highlight]))
+    return snippets
+
+
+def candidate_phrases(text: str, max_words: int = 4) -> List[List[str]]:
+    """RAKE candidates: runs of non-stopwords between stopwords and punctuation, at most max_words long."""
+    phrases = []
+    for fragment in PHRASE_BREAK_PATTERN.split(text.lower()):
+        phrase = []
+        for word in fragment.split():
+            if word in PHRASE_STOPWORDS or not WORD_PATTERN.fullmatch(word):
+                if phrase:
+                    phrases.append(phrase)
+                phrase = []
+            else:
+                phrase.append(word)
+        if phrase:
+            phrases.append(phrase)
+    return [phrase[:max_words] for phrase in phrases]
+
+
+def extract_keyphrases(snippets: List[Tuple[str, List[str]]], top_n: int = 3,
+                       title_weight: float = 2.0) -> List[str]:
+    """
+    Rank RAKE phrases (sum of word degree over frequency) across titles
+    and highlights, with phrases from titles counted title_weight times.
+    """
+    weighted = [(title, title_weight) for title, _ in snippets]
+    weighted += [(highlight, 1.0) for _, highlights in snippets for highlight in highlights]
+    frequency = defaultdict(float)
+    degree = defaultdict(float)
+    phrase_weight = defaultdict(float)
+    for text, weight in weighted:
+        for phrase in candidate_phrases(text):
+            phrase_weight[tuple(phrase)] += weight
+            for word in phrase:
+                frequency[word] += weight
+                degree[word] += weight * len(phrase)
+    scores = {
+        phrase: sum(degree[word] / frequency[word] for word in phrase) * weight
+        for phrase, weight in phrase_weight.items()
+    }
+    ranked = sorted(scores, key=lambda phrase: (-scores[phrase], phrase))
+    chosen = []
+    seen_words = set()
+    for phrase in ranked:
+        if set(phrase) <= seen_words:
+            continue
+        chosen.append(" ".join(phrase))
+        seen_words.update(phrase)
+        if len(chosen) == top_n:
+            break
+    return chosen
+
+
+def keyphrase_title(exa_results: Any, max_words: int = 8) -> str:
+    """Search phrase built from the top keyphrases, without repeated words."""
+    words = []
+    for phrase in extract_keyphrases(exa_snippets(exa_results)):
+        words += [word for word in phrase.split() if word not in words]
+    return " ".join(words[:max_words])
+
+
+def snippet_digest(exa_results: Any, max_chars: int = 4000) -> str:
+    """Titles and highlights only, as compact prompt text."""
+    lines = []
+    for title, highlights in exa_snippets(exa_results):
+        lines.append(f"Title: {title}")
+        lines += [f"- {' '.join(highlight.split())}" for highlight in highlights]
+    return "\n".join(lines)[:max_chars]
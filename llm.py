@@ -1,40 +1,51 @@
+import json
 import os
 import re
+import sqlite3
+import threading
+import time
+import uuid
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import lxml.etree
+import lxml.html
 from dotenv import load_dotenv
 load_dotenv()
-import arxiv
-from typing import Dict, Union
-from exa_py import Exa
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Union
 from langchain_core.tools import tool
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import AIMessage, SystemMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.prebuilt import create_react_agent
+from script_cache import ScriptCache, canonical_paper_key, parse_arxiv_id, prompt_hash
+from script_stream import ScriptStreamParser
+from compaction import compact, compaction_stats
+import arxiv_api
+import http_client
+import components
+from components import MODEL_NAME
 
-memory = MemorySaver()
-model = ChatGoogleGenerativeAI(model="gemini-2.0-flash")
+CHECKPOINTER = os.getenv("CHECKPOINTER", "memory")
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", "checkpoints.db")
+CHECKPOINT_TTL = float(os.getenv("CHECKPOINT_TTL", "3600"))
+CHECKPOINT_MAX_THREADS = int(os.getenv("CHECKPOINT_MAX_THREADS", "32"))
+SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(2 * 1024 * 1024)))
+SCRAPE_PARSER = os.getenv("SCRAPE_PARSER", "lxml")
+SCRAPE_CHUNK_SIZE = 64 * 1024
+SCRAPE_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+SCRAPE_TAGS = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']
 
-try:
-    exa = Exa(api_key=os.environ["EXA_API_KEY"])
-except KeyError:
-    print("Warning: EXA_API_KEY environment variable not found")
-    exa = None
-client = arxiv.Client()
+def create_checkpointer():
+    """Build the agent checkpointer: in-process by default, or SQLite on disk."""
+    if CHECKPOINTER == "sqlite":
+        from langgraph.checkpoint.sqlite import SqliteSaver
+        return SqliteSaver(sqlite3.connect(CHECKPOINT_DB, check_same_thread=False))
+    from langgraph.checkpoint.memory import MemorySaver
+    return MemorySaver()
 
-system_message = SystemMessage(
-    content="""You are a comprehensive research assistant specializing in academic paper retrieval and podcast script creation. Follow this process strictly:
-    1. From the user input, identify the research paper URL.
-    2. If the URL is from arxiv.org (e.g., contains 'arxiv.org/abs/' or 'arxiv.org/pdf/'), extract the arxiv ID:
-       - For URLs like 'https://arxiv.org/abs/<id>', take the ID after '/abs/'.
-       - For URLs like 'https://arxiv.org/pdf/<id>.pdf', take the ID between '/pdf/' and '.pdf'.
-       Use the extracted ID with the arxiv tool to retrieve the paper's metadata.
-    3. If the URL is not from arxiv.org, use the scrape_webpage tool to retrieve the content.
-    4. After obtaining the paper's content (either from arxiv or webpage), create a detailed podcast script.
+threads = OrderedDict()
+threads_lock = threading.Lock()
 
-    The podcast script must be in a structured JSON format. The JSON object should have a "title" key containing the research paper's title. All other keys (e.g., "host_intro", "paper_overview", "methodology", "results", "real_world_applications", "limitations", "conclusion", "outro") should contain a list of dialogue objects. The "key_insights" key should contain a list of lists, where each inner list represents one key insight and contains dialogue objects for that insight.
+script_instructions = """The podcast script must be in a structured JSON format. The JSON object should have a "title" key containing the research paper's title. All other keys (e.g., "host_intro", "paper_overview", "methodology", "results", "real_world_applications", "limitations", "conclusion", "outro") should contain a list of dialogue objects. The "key_insights" key should contain a list of lists, where each inner list represents one key insight and contains dialogue objects for that insight.
 
     Each dialogue object within the lists must have the following structure:
     {
@@ -103,6 +114,24 @@ system_message = SystemMessage(
     - **Accuracy:** Base the script strictly on the information retrieved from the research paper (via arxiv tool or scraping).
     - **Output Format:** Ensure the final output is ONLY the valid JSON object described above, enclosed in ```json ... ``` markers.
     """
+
+system_message = SystemMessage(
+    content="""You are a comprehensive research assistant specializing in academic paper retrieval and podcast script creation. Follow this process strictly:
+    1. From the user input, identify the research paper URL.
+    2. If the URL is from arxiv.org (e.g., contains 'arxiv.org/abs/' or 'arxiv.org/pdf/'), extract the arxiv ID:
+       - For URLs like 'https://arxiv.org/abs/<id>', take the ID after '/abs/'.
+       - For URLs like 'https://arxiv.org/pdf/<id>.pdf', take the ID between '/pdf/' and '.pdf'.
+       Use the extracted ID with the arxiv tool to retrieve the paper's metadata.
+    3. If the URL is not from arxiv.org, use the scrape_webpage tool to retrieve the content.
+    4. After obtaining the paper's content (either from arxiv or webpage), create a detailed podcast script.
+
+    """ + script_instructions
+)
+
+generation_message = SystemMessage(
+    content="""You are a comprehensive research assistant specializing in podcast script creation. The research paper's metadata from arxiv is provided in the user message; create a detailed podcast script from it without calling any tools.
+
+    """ + script_instructions
 )
 
 prompt = ChatPromptTemplate.from_messages([
@@ -110,43 +139,100 @@ prompt = ChatPromptTemplate.from_messages([
     MessagesPlaceholder(variable_name="messages")
 ])
 
+def fetch_arxiv_paper(arxiv_id: str) -> Union[Dict[str, Any], None]:
+    """Fetch one paper's metadata from the arXiv API through the shared session."""
+    response = http_client.session.get(arxiv_api.query_url(id_list=[arxiv_id], max_results=1))
+    response.raise_for_status()
+    paper = next(iter(arxiv_api.parse_feed(response.content)), None)
+    if not paper:
+        return None
+    return {
+        "title": paper["title"],
+        "summary": paper["summary"],
+        "authors": paper["authors"],
+        "published": paper["published"][:10],
+        "categories": paper["categories"],
+        "url": paper["entry_id"]
+    }
+
 @tool
 def search_arxiv(query: str) -> Union[Dict[str, str], str]:
     """Retrieve a paper from arxiv given an ID."""
     try:
         if not re.match(r'\d+\.\d+', query):
             return "Invalid arxiv ID format. Please provide a valid ID (e.g., 2504.20010)."
-        search = arxiv.Search(id_list=[query])
-        paper = next(client.results(search), None)
+        paper = fetch_arxiv_paper(query)
         if paper:
-            return {
-                "title": paper.title,
-                "summary": paper.summary,
-                "authors": [author.name for author in paper.authors],
-                "url": paper.entry_id
-            }
+            return {key: paper[key] for key in ("title", "summary", "authors", "url")}
         return "No paper found with that ID."
     except Exception as e:
         return f"Error searching arxiv: {str(e)}"
 
+def unsupported_content(content_type: str, head: bytes) -> Union[str, None]:
+    """Reason to stop reading a response, judged from its Content-Type and first bytes."""
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type and not media_type.startswith(SCRAPE_CONTENT_TYPES):
+        return f"Unsupported content type {media_type}"
+    if head.lstrip()[:5] == b"%PDF-":
+        return "Unsupported content type application/pdf"
+    return None
+
+def page_text(title: Union[str, None], texts: Any) -> Union[Dict[str, str], str]:
+    content = "\n".join([text for text in (text.strip() for text in texts) if text])
+    if not content:
+        return "No substantial content found on the webpage."
+    return {
+        "title": title.strip() if title and title.strip() else "Untitled Research Paper",
+        "content": content
+    }
+
+def parse_page(html: bytes, parser: str = SCRAPE_PARSER) -> Union[Dict[str, str], str]:
+    """
+    Title and heading/paragraph text of a scraped page. "lxml" walks an
+    lxml.html tree directly; "html.parser" builds only the extracted tags
+    with a SoupStrainer; "full" is the old complete html.parser DOM.
+    """
+    if parser == "lxml":
+        try:
+            document = lxml.html.document_fromstring(html)
+        except (lxml.etree.ParserError, ValueError):
+            return "No substantial content found on the webpage."
+        title = document.find(".//title")
+        return page_text(title.text if title is not None else None,
+                         (element.text_content() for element in document.iter(*SCRAPE_TAGS)))
+    if parser == "full":
+        soup = BeautifulSoup(html, 'html.parser')
+    else:
+        soup = BeautifulSoup(html, parser, parse_only=SoupStrainer(['title', *SCRAPE_TAGS]))
+    title = soup.title.string if soup.title else None
+    return page_text(title, (element.get_text() for element in soup.find_all(SCRAPE_TAGS)))
+
+def compact_page(page: Union[Dict[str, str], str]) -> Union[Dict[str, str], str]:
+    """Pack a scraped page's content into the generation token budget."""
+    if isinstance(page, dict):
+        page["content"], stats = compact(page["content"])
+        compaction_stats.record(stats)
+        if stats["tokens_after"] < stats["tokens_before"]:
+            print(f"Compacted page from ~{stats['tokens_before']} to ~{stats['tokens_after']} tokens "
+                  f"({stats['paragraphs_kept']}/{stats['paragraphs']} paragraphs)")
+    return page
+
 @tool
 def scrape_webpage(url: str) -> Union[Dict[str, str], str]:
     """Scrape content from a webpage."""
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        main_content = soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-        content = "\n".join([element.get_text().strip() for element in main_content if element.get_text().strip()])
-        title = soup.title.string.strip() if soup.title and soup.title.string else "Untitled Research Paper"
-        
-        if not content:
-            return "No substantial content found on the webpage."
-        
-        return {
-            "title": title,
-            "content": content
-        }
+        with http_client.session.get(url, stream=True) as response:
+            response.raise_for_status()
+            body = bytearray()
+            for chunk in response.iter_content(SCRAPE_CHUNK_SIZE):
+                if not body:
+                    reason = unsupported_content(response.headers.get("Content-Type", ""), chunk)
+                    if reason:
+                        return f"Error scraping webpage: {reason}"
+                body += chunk
+                if len(body) >= SCRAPE_MAX_BYTES:
+                    break
+        return compact_page(parse_page(bytes(body[:SCRAPE_MAX_BYTES])))
     except requests.RequestException as e:
         return f"Error scraping webpage: {str(e)}"
     except Exception as e:
@@ -154,21 +240,182 @@ def scrape_webpage(url: str) -> Union[Dict[str, str], str]:
 
 tools = [search_arxiv, scrape_webpage]
 
-agent_executor = create_react_agent(model, tools, prompt=prompt, checkpointer=memory)
+def create_agent():
+    from langgraph.prebuilt import create_react_agent
+    return create_react_agent(components.get("model"), tools, prompt=prompt, checkpointer=components.get("checkpointer"))
+
+def load_threads(memory: Any) -> None:
+    """Register threads already persisted by an on-disk checkpointer so they age out too."""
+    if CHECKPOINTER != "sqlite":
+        return
+    with threads_lock:
+        for checkpoint in memory.list(None):
+            thread_id = checkpoint.config["configurable"]["thread_id"]
+            if thread_id not in threads:
+                threads[thread_id] = time.time()
+
+def evict_threads() -> None:
+    """Delete threads older than CHECKPOINT_TTL and make room for one more under CHECKPOINT_MAX_THREADS."""
+    now = time.time()
+    with threads_lock:
+        expired = [thread_id for thread_id, created_at in threads.items() if now - created_at > CHECKPOINT_TTL]
+        overflow = max(len(threads) - len(expired) - CHECKPOINT_MAX_THREADS + 1, 0)
+        expired += [thread_id for thread_id in threads if thread_id not in expired][:overflow]
+        for thread_id in expired:
+            del threads[thread_id]
+    if not components.registry.built("checkpointer"):
+        return
+    memory = components.get("checkpointer")
+    for thread_id in expired:
+        try:
+            memory.delete_thread(thread_id)
+        except Exception as e:
+            print(f"Error deleting checkpoint thread {thread_id}: {e}")
+
+def new_thread_id() -> str:
+    """Start a fresh conversation thread for one request."""
+    evict_threads()
+    thread_id = f"podcast_script-{uuid.uuid4().hex}"
+    with threads_lock:
+        threads[thread_id] = time.time()
+    return thread_id
+
+def _payload_bytes(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_payload_bytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_bytes(item) for item in value)
+    return 0
+
+def checkpoint_store_size() -> Dict[str, Any]:
+    """Number of tracked threads and approximate bytes held by the checkpointer."""
+    with threads_lock:
+        tracked = len(threads)
+    if CHECKPOINTER == "sqlite":
+        size = sum(os.path.getsize(path) for path in (CHECKPOINT_DB, f"{CHECKPOINT_DB}-wal") if os.path.exists(path))
+    elif components.registry.built("checkpointer"):
+        memory = components.get("checkpointer")
+        size = _payload_bytes(memory.storage) + _payload_bytes(memory.writes) + _payload_bytes(memory.blobs)
+    else:
+        size = 0
+    return {"backend": CHECKPOINTER, "threads": tracked, "bytes": size}
+
+def build_checkpointer():
+    memory = create_checkpointer()
+    load_threads(memory)
+    return memory
+
+components.registry.register("checkpointer", build_checkpointer)
+components.registry.register("agent", create_agent)
 
-def process_url(research_paper_url: str) -> str:
-    """Process user input to create a podcast script for the research paper."""
-    config = {"configurable": {"thread_id": "podcast_script"}}
+script_cache = ScriptCache()
+PROMPT_VERSION = prompt_hash(system_message.content, generation_message.content)
+ARXIV_FAST_PATH = os.getenv("ARXIV_FAST_PATH", "1") != "0"
+
+def extract_script(final_message: str) -> str:
+    """Pull the JSON script out of a ```json fenced block, if there is one."""
+    match = re.search(r'```json\n(.*?)```', final_message, re.DOTALL)
+    if match:
+        json_content = match.group(1).strip()
+        return json_content.replace("```json", "").replace("```", "").strip()
+    return final_message.strip()
+
+def format_paper(paper: Dict[str, Any]) -> str:
+    return "\n".join([
+        f"Title: {paper['title']}",
+        f"Authors: {', '.join(paper['authors'])}",
+        f"Published: {paper.get('published') or 'unknown'}",
+        f"Categories: {', '.join(paper.get('categories') or [])}",
+        f"URL: {paper['url']}",
+        "",
+        f"Abstract: {paper['summary']}",
+    ])
+
+def message_text(message: Any) -> str:
+    """Text content of a (possibly multi-part) model message or chunk."""
+    content = message.content
+    if isinstance(content, list):
+        return "".join(part if isinstance(part, str) else part.get("text", "") for part in content)
+    return content or ""
+
+def generate_from_arxiv(arxiv_id: str, on_text: Callable[[str], None]) -> Union[str, None]:
+    """Script an arXiv paper with a single streamed generation call, or None if the paper can't be fetched."""
+    paper = fetch_arxiv_paper(arxiv_id)
+    if not paper:
+        return None
+    messages = [
+        generation_message,
+        HumanMessage(content=f"Create a podcast script for this research paper:\n\n{format_paper(paper)}"),
+    ]
+    chunks = []
+    for chunk in components.get("model").stream(messages):
+        text = message_text(chunk)
+        chunks.append(text)
+        on_text(text)
+    return "".join(chunks)
+
+def run_agent(research_paper_url: str, on_text: Callable[[str, bool], None]) -> str:
+    """
+    Let the ReAct agent retrieve the paper with its tools and stream the
+    script it writes. on_text is told when a new AI message starts, since
+    only the last message holds the script.
+    """
+    config = {"configurable": {"thread_id": new_thread_id()}}
     messages = [HumanMessage(content=f"Create a podcast script for this research paper: {research_paper_url}")]
+    final_message = ""
+    final_message_id = None
+    for chunk, metadata in components.get("agent").stream({"messages": messages}, config=config, stream_mode="messages"):
+        if not isinstance(chunk, AIMessage) or metadata.get("langgraph_node") != "agent":
+            continue
+        new_message = chunk.id != final_message_id
+        if new_message:
+            final_message_id = chunk.id
+            final_message = ""
+        text = message_text(chunk)
+        final_message += text
+        on_text(text, new_message)
+    return final_message
+
+def process_url(research_paper_url: str, on_section: Union[Callable[[str, Union[int, None], Any], None], None] = None) -> str:
+    """
+    Process user input to create a podcast script for the research paper.
+    The script is generated as a stream; on_section, if given, is called
+    with (section_key, index, value) as soon as each top-level section or
+    key_insights block of the script is complete.
+    """
+    parser = ScriptStreamParser()
+
+    def on_text(text: str, new_message: bool = False) -> None:
+        nonlocal parser
+        if new_message:
+            parser = ScriptStreamParser()
+        for event in parser.feed(text):
+            if on_section:
+                on_section(*event)
+
+    paper_key = canonical_paper_key(research_paper_url)
+    cached_script = script_cache.get(paper_key, MODEL_NAME, PROMPT_VERSION)
+    if cached_script:
+        print(f"Script cache hit: {paper_key}")
+        on_text(cached_script)
+        return cached_script
     try:
-        result = agent_executor.invoke({"messages": messages}, config=config)
-        final_message = result.get("messages", [])[-1].content
-        match = re.search(r'```json\n(.*?)```', final_message, re.DOTALL)
-        if match:
-            json_content = match.group(1).strip()
-            final_message = json_content.replace("```json", "").replace("```", "").strip()
-        else:
-            final_message = final_message.strip()
+        final_message = None
+        arxiv_id = parse_arxiv_id(research_paper_url)
+        if arxiv_id and ARXIV_FAST_PATH:
+            final_message = generate_from_arxiv(arxiv_id, on_text)
+            if final_message is None:
+                print(f"arXiv paper {arxiv_id} not found, falling back to the agent")
+        if final_message is None:
+            final_message = run_agent(research_paper_url, on_text)
+        final_message = extract_script(final_message)
+        try:
+            json.loads(final_message)
+            script_cache.put(paper_key, MODEL_NAME, PROMPT_VERSION, final_message)
+        except json.JSONDecodeError:
+            print(f"Not caching script for {paper_key}: response was not valid JSON")
         return final_message
     except Exception as e:
         return f"Error generating podcast script: {str(e)}"
@@ -0,0 +1,153 @@
+import os
+import re
+import tempfile
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Mapping, Optional
+
+from fastapi.responses import FileResponse, Response
+
+MEDIA_CACHE_CONTROL = os.getenv("MEDIA_CACHE_CONTROL", "public, max-age=31536000, immutable")
+MEDIA_PRERENDER_PROFILES = [name.strip() for name in os.getenv("MEDIA_PRERENDER_PROFILES", "").split(",") if name.strip()]
+SOURCE_PROFILE = "mp3"
+MEDIA_PROFILES = {
+    "mp3": {"ext": "mp3", "media_type": "audio/mpeg"},
+    "opus": {
+        "ext": "opus", "media_type": "audio/ogg", "format": "opus", "codec": "libopus",
+        "bitrate": os.getenv("MEDIA_OPUS_BITRATE", "32k"), "parameters": ["-ac", "1", "-application", "voip"],
+    },
+    "aac": {
+        "ext": "m4a", "media_type": "audio/mp4", "format": "ipod", "codec": "aac",
+        "bitrate": os.getenv("MEDIA_AAC_BITRATE", "48k"), "parameters": ["-ac", "1", "-movflags", "+faststart"],
+    },
+}
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+
+_encode_locks = {}
+_encode_locks_lock = threading.Lock()
+
+
+def profile_for_ext(ext: str) -> Optional[str]:
+    for name, profile in MEDIA_PROFILES.items():
+        if profile["ext"] == ext:
+            return name
+    return None
+
+
+def encode_profile(source_path: str, profile: str) -> str:
+    """
+    Path of source_path encoded with profile, transcoding it on first use.
+    The encoded file sits next to the source under the same content hash,
+    so it is as immutable as the source; concurrent requests for the same
+    file encode it once. Raises RuntimeError if encoding fails.
+    """
+    settings = MEDIA_PROFILES[profile]
+    output_path = f"{os.path.splitext(source_path)[0]}.{settings['ext']}"
+    if os.path.exists(output_path):
+        return output_path
+    with _encode_locks_lock:
+        lock = _encode_locks.setdefault(output_path, threading.Lock())
+    with lock:
+        if os.path.exists(output_path):
+            return output_path
+        from pydub import AudioSegment
+        output_dir = os.path.dirname(output_path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix=".tmp-", suffix=f".{settings['ext']}")
+        os.close(fd)
+        try:
+            AudioSegment.from_file(source_path).export(
+                tmp_path, format=settings["format"], codec=settings["codec"],
+                bitrate=settings["bitrate"], parameters=settings["parameters"],
+            )
+            os.replace(tmp_path, output_path)
+        except Exception as e:
+            raise RuntimeError(f"Encoding {source_path} as {profile} failed: {e}") from e
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    print(f"Encoded {output_path} ({profile}, {settings['bitrate']})")
+    return output_path
+
+
+def prerender_profiles(source_path: str) -> None:
+    """Encode the profiles listed in MEDIA_PRERENDER_PROFILES ahead of the first request."""
+    for profile in MEDIA_PRERENDER_PROFILES:
+        if profile == SOURCE_PROFILE or profile not in MEDIA_PROFILES:
+            continue
+        try:
+            encode_profile(source_path, profile)
+        except Exception as e:
+            print(f"Error encoding {source_path} as {profile}: {e}")
+
+
+def resolve_media(media_dir: str, file_name: str) -> str:
+    """
+    Path of a content-addressed file in media_dir, encoding it from the
+    mp3 with the same hash when it is a missing profile variant. Raises
+    FileNotFoundError for names that are not content-addressed or have no
+    source.
+    """
+    if not CONTENT_ADDRESSED_NAME.match(file_name):
+        raise FileNotFoundError(file_name)
+    path = os.path.join(media_dir, file_name)
+    if os.path.exists(path):
+        return path
+    stem, ext = os.path.splitext(file_name)
+    profile = profile_for_ext(ext[1:])
+    source_path = os.path.join(media_dir, f"{stem}.{MEDIA_PROFILES[SOURCE_PROFILE]['ext']}")
+    if profile is None or not os.path.exists(source_path):
+        raise FileNotFoundError(file_name)
+    return encode_profile(source_path, profile)
+
+
+def entity_tag(path: str, stat_result: os.stat_result) -> str:
+    """Strong ETag: the file name for content-addressed files, else size and mtime."""
+    file_name = os.path.basename(path)
+    if CONTENT_ADDRESSED_NAME.match(file_name):
+        return f'"{file_name}"'
+    return f'"{stat_result.st_size:x}-{int(stat_result.st_mtime * 1e6):x}"'
+
+
+def not_modified(request_headers: Mapping[str, str], etag: str, last_modified: float) -> bool:
+    """
+    RFC 9110 conditional GET: If-None-Match (weak comparison) decides when
+    present, otherwise If-Modified-Since at one-second precision.
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        opaque = etag[2:] if etag.startswith("W/") else etag
+        return any(
+            (tag.strip()[2:] if tag.strip().startswith("W/") else tag.strip()) == opaque
+            for tag in if_none_match.split(",")
+        )
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return since is not None and int(last_modified) <= since.timestamp()
+
+
+def media_response(request_headers: Mapping[str, str], path: str, filename: Optional[str] = None) -> Response:
+    """
+    Serve a rendered episode with validators for browser and CDN caching:
+    304 for a matching If-None-Match/If-Modified-Since, otherwise a
+    FileResponse, which answers Range (and If-Range) requests with 206.
+    """
+    stat_result = os.stat(path)
+    media_type = MEDIA_PROFILES.get(profile_for_ext(os.path.splitext(path)[1][1:]) or "", {}).get("media_type")
+    headers = {
+        "etag": entity_tag(path, stat_result),
+        "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "cache-control": MEDIA_CACHE_CONTROL,
+        "accept-ranges": "bytes",
+    }
+    if not_modified(request_headers, headers["etag"], stat_result.st_mtime):
+        return Response(status_code=304, headers={key: value for key, value in headers.items() if key != "accept-ranges"})
+    return FileResponse(path, media_type=media_type, filename=filename, headers=headers,
+                        stat_result=stat_result, content_disposition_type="inline")
+
@@ -0,0 +1,167 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Dict, List
+
+from dedup import title_fingerprint
+from query_cache import normalize_query
+from ranking import tokenize
+
+PAPER_STORE_DB = os.getenv("PAPER_STORE_DB", "papers.db")
+PAPER_STORE_TTL = float(os.getenv("PAPER_STORE_TTL", str(7 * 86400)))
+PAPER_STORE_MIN_RESULTS = int(os.getenv("PAPER_STORE_MIN_RESULTS", "10"))
+PAPER_STORE_LIMIT = int(os.getenv("PAPER_STORE_LIMIT", "50"))
+
+
+def paper_key(paper: Dict[str, Any]) -> str:
+    """Stable identity for a stored paper: arXiv ID, then DOI, then source id, then title."""
+    if paper.get("arxiv_id"):
+        return f"arxiv:{paper['arxiv_id']}"
+    if paper.get("doi"):
+        return f"doi:{paper['doi']}"
+    if paper.get("id"):
+        return f"id:{paper.get('source')}:{paper['id']}"
+    return f"title:{title_fingerprint(paper.get('title', ''))}"
+
+
+def match_expression(query: str, operator: str = "OR") -> str:
+    """FTS5 MATCH expression from the query's tokens, each quoted so user text is never parsed as syntax."""
+    return f" {operator} ".join(f'"{token}"' for token in dict.fromkeys(tokenize(query)))
+
+
+class PaperStore:
+    """
+    Local paper metadata from every remote fetch, searchable with SQLite FTS5
+    over title, abstract, authors and categories.
+
+    Complete remote fetches are recorded per normalized query, so a query
+    is answered locally only while its last fetch is younger than ttl and
+    enough stored papers match all of its terms.
+    """
+
+    def __init__(self, path: str = PAPER_STORE_DB, ttl: float = PAPER_STORE_TTL,
+                 min_results: int = PAPER_STORE_MIN_RESULTS):
+        self.path = path
+        self.ttl = ttl
+        self.min_results = min_results
+        self.local_hits = 0
+        self.remote_fetches = 0
+        self._lock = threading.Lock()
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS papers (
+                    rowid INTEGER PRIMARY KEY,
+                    key TEXT UNIQUE NOT NULL,
+                    title TEXT,
+                    abstract TEXT,
+                    authors TEXT,
+                    categories TEXT,
+                    data TEXT NOT NULL,
+                    fetched_at REAL
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                    title, abstract, authors, categories, content='papers', content_rowid='rowid'
+                );
+                CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+                    INSERT INTO papers_fts (rowid, title, abstract, authors, categories)
+                    VALUES (new.rowid, new.title, new.abstract, new.authors, new.categories);
+                END;
+                CREATE TRIGGER IF NOT EXISTS papers_ad AFTER DELETE ON papers BEGIN
+                    INSERT INTO papers_fts (papers_fts, rowid, title, abstract, authors, categories)
+                    VALUES ('delete', old.rowid, old.title, old.abstract, old.authors, old.categories);
+                END;
+                CREATE TRIGGER IF NOT EXISTS papers_au AFTER UPDATE ON papers BEGIN
+                    INSERT INTO papers_fts (papers_fts, rowid, title, abstract, authors, categories)
+                    VALUES ('delete', old.rowid, old.title, old.abstract, old.authors, old.categories);
+                    INSERT INTO papers_fts (rowid, title, abstract, authors, categories)
+                    VALUES (new.rowid, new.title, new.abstract, new.authors, new.categories);
+                END;
+                CREATE TABLE IF NOT EXISTS fetches (
+                    query TEXT PRIMARY KEY,
+                    fetched_at REAL NOT NULL
+                );
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def add(self, papers: List[Dict[str, Any]]) -> None:
+        now = time.time()
+        rows = [
+            (
+                paper_key(paper),
+                paper.get("title"),
+                paper.get("abstract"),
+                ", ".join(paper.get("authors") or []),
+                " ".join(paper.get("categories") or []),
+                json.dumps(paper),
+                now,
+            )
+            for paper in papers
+        ]
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany("""
+                INSERT INTO papers (key, title, abstract, authors, categories, data, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    title = excluded.title, abstract = excluded.abstract, authors = excluded.authors,
+                    categories = excluded.categories, data = excluded.data, fetched_at = excluded.fetched_at
+            """, rows)
+
+    def record_fetch(self, query: str) -> None:
+        self.remote_fetches += 1
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO fetches (query, fetched_at) VALUES (?, ?)",
+                (normalize_query(query), time.time()),
+            )
+
+    def _search(self, conn: sqlite3.Connection, query: str, limit: int, operator: str = "OR") -> List[str]:
+        expression = match_expression(query, operator)
+        if not expression:
+            return []
+        rows = conn.execute("""
+            SELECT papers.data FROM papers_fts JOIN papers ON papers.rowid = papers_fts.rowid
+            WHERE papers_fts MATCH ? ORDER BY bm25(papers_fts) LIMIT ?
+        """, (expression, limit)).fetchall()
+        return [row[0] for row in rows]
+
+    def _is_fresh(self, conn: sqlite3.Connection, query: str) -> bool:
+        row = conn.execute("SELECT fetched_at FROM fetches WHERE query = ?", (normalize_query(query),)).fetchone()
+        return bool(row) and time.time() - row[0] <= self.ttl
+
+    def search(self, query: str, limit: int = PAPER_STORE_LIMIT, operator: str = "OR") -> List[Dict[str, Any]]:
+        with self._lock, closing(self._connect()) as conn:
+            return [json.loads(data) for data in self._search(conn, query, limit, operator)]
+
+    def lookup(self, query: str, limit: int = PAPER_STORE_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Stored candidates for the query, or an empty list when remote
+        sources should be consulted: the query has not been fetched within
+        ttl, or fewer than min_results papers match all of its terms.
+        """
+        with self._lock, closing(self._connect()) as conn:
+            if not self._is_fresh(conn, query) or len(self._search(conn, query, self.min_results, "AND")) < self.min_results:
+                return []
+            rows = self._search(conn, query, limit)
+        if rows:
+            self.local_hits += 1
+        return [json.loads(data) for data in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock, closing(self._connect()) as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+            queries = conn.execute("SELECT COUNT(*) FROM fetches").fetchone()[0]
+        lookups = self.local_hits + self.remote_fetches
+        return {
+            "local_hits": self.local_hits,
+            "remote_fetches": self.remote_fetches,
+            "local_hit_rate": self.local_hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "queries": queries,
+        }
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import Any, Awaitable, Callable, Dict, Union
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU whose entries expire after ttl seconds,
+    optionally persisted to a SQLite file so it survives restarts.
+
+    With stale_ttl > 0, an entry that expired less than stale_ttl seconds
+    ago is still returned by aget_or_compute while a background refresh
+    replaces it (stale-while-revalidate). The refresh runs in its own task
+    and completes even if the caller gives up, but a miss is computed in
+    the caller's task: when the caller is cancelled, e.g. by a source
+    deadline in afan_out, nothing is stored. SQLite reads and writes run
+    in worker threads.
+    """
+
+    def __init__(self, name: str, ttl: float, maxsize: int = 1024, stale_ttl: float = 0,
+                 db_path: Union[str, None] = None):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self.db_path = db_path
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._refresh_tasks = set()
+        self._lock = threading.Lock()
+        if db_path:
+            with closing(sqlite3.connect(db_path, timeout=30)) as conn, conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS query_cache (
+                        name TEXT NOT NULL,
+                        key TEXT NOT NULL,
+                        value TEXT NOT NULL,
+                        stored_at REAL NOT NULL,
+                        PRIMARY KEY (name, key)
+                    )
+                """)
+
+    def _cached(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _load(self, key: str):
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn:
+            row = conn.execute(
+                "SELECT value, stored_at FROM query_cache WHERE name = ? AND key = ?", (self.name, key)
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    async def _alookup(self, key: str):
+        """The in-memory entry, or the persisted one loaded in a worker thread so SQLite never blocks the loop."""
+        entry = self._cached(key)
+        if entry or not self.db_path:
+            return entry
+        entry = await asyncio.to_thread(self._load, key)
+        if entry:
+            self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _persist(self, key: str, value: Any, stored_at: float) -> None:
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO query_cache (name, key, value, stored_at) VALUES (?, ?, ?, ?)",
+                (self.name, key, json.dumps(value), stored_at),
+            )
+            conn.execute(
+                "DELETE FROM query_cache WHERE name = ? AND stored_at < ?",
+                (self.name, stored_at - self.ttl - self.stale_ttl),
+            )
+
+    async def aset(self, key: str, value: Any) -> None:
+        entry = (value, time.time())
+        self._remember(key, entry)
+        if self.db_path:
+            await asyncio.to_thread(self._persist, key, value, entry[1])
+
+    async def _arefresh(self, key: str, compute: Callable[[], Awaitable[Any]], cacheable: Callable[[Any], bool]) -> None:
+        try:
+            value = await compute()
+            if cacheable(value):
+                await self.aset(key, value)
+        except Exception as e:
+            print(f"Background refresh of {self.name} cache for {key!r} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    async def aget_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]],
+                              cacheable: Callable[[Any], bool] = lambda value: value is not None) -> Any:
+        """Cached value for key, awaiting compute() on a miss; stale entries are refreshed in a task on the running loop."""
+        entry = await self._alookup(key)
+        if entry:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age <= self.ttl:
+                self.hits += 1
+                return value
+            if age <= self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                with self._lock:
+                    start_refresh = key not in self._refreshing
+                    self._refreshing.add(key)
+                if start_refresh:
+                    task = asyncio.create_task(self._arefresh(key, compute, cacheable))
+                    self._refresh_tasks.add(task)
+                    task.add_done_callback(self._refresh_tasks.discard)
+                return value
+        self.misses += 1
+        value = await compute()
+        if cacheable(value):
+            await self.aset(key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        with self._lock:
+            entries = len(self._entries)
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "entries": entries,
+            "ttl": self.ttl,
+        }
@@ -0,0 +1,76 @@
+import math
+import os
+import re
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, List
+
+import numpy as np
+
+RANK_TOP_K = int(os.getenv("RANK_TOP_K", "10"))
+RANK_RELEVANCE_WEIGHT = float(os.getenv("RANK_RELEVANCE_WEIGHT", "0.7"))
+RANK_RECENCY_WEIGHT = float(os.getenv("RANK_RECENCY_WEIGHT", "0.2"))
+RANK_CITATION_WEIGHT = float(os.getenv("RANK_CITATION_WEIGHT", "0.1"))
+RANK_RECENCY_HALF_LIFE = float(os.getenv("RANK_RECENCY_HALF_LIFE", "3"))
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it", "its",
+    "of", "on", "or", "that", "the", "this", "to", "we", "with", "via", "using", "our", "can",
+}
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+def bm25_scores(query: str, documents: List[List[str]], k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """BM25 score of every tokenized document against the query, computed as one matrix."""
+    terms = sorted(set(tokenize(query)))
+    if not terms or not documents:
+        return np.zeros(len(documents))
+    counts = [Counter(document) for document in documents]
+    tf = np.array([[document_counts.get(term, 0) for term in terms] for document_counts in counts], dtype=float)
+    lengths = np.array([len(document) for document in documents], dtype=float)
+    df = (tf > 0).sum(axis=0)
+    idf = np.log1p((len(documents) - df + 0.5) / (df + 0.5))
+    norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0))
+    return ((tf * (k1 + 1)) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+
+def paper_year(paper: Dict[str, Any]) -> float:
+    year = paper.get("year")
+    if isinstance(year, int):
+        return float(year)
+    match = re.match(r"(\d{4})", str(year or ""))
+    return float(match.group(1)) if match else math.nan
+
+
+def rank_papers(query: str, papers: List[Dict[str, Any]], top_k: int = RANK_TOP_K,
+                relevance_weight: float = RANK_RELEVANCE_WEIGHT, recency_weight: float = RANK_RECENCY_WEIGHT,
+                citation_weight: float = RANK_CITATION_WEIGHT) -> List[Dict[str, Any]]:
+    """
+    Rank papers by BM25 over title (counted twice) and abstract, blended with
+    recency and citation count, and return the top_k (or all, if fewer).
+    """
+    if not papers:
+        return []
+    documents = [
+        tokenize(paper.get("title", "")) * 2 + tokenize(paper.get("abstract", ""))
+        for paper in papers
+    ]
+    relevance = bm25_scores(query, documents)
+    if relevance.max() > 0:
+        relevance = relevance / relevance.max()
+
+    years = np.array([paper_year(paper) for paper in papers])
+    age = np.clip(date.today().year - years, 0, None)
+    recency = np.where(np.isnan(age), 0.0, 0.5 ** (age / RANK_RECENCY_HALF_LIFE))
+
+    citations = np.log1p(np.array([paper.get("citationCount") or 0 for paper in papers], dtype=float))
+    if citations.max() > 0:
+        citations = citations / citations.max()
+
+    scores = relevance_weight * relevance + recency_weight * recency + citation_weight * citations
+    order = np.argsort(-scores, kind="stable")[:top_k]
+    return [papers[i] for i in order]
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Dict, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+SCRIPT_CACHE_DB = os.getenv("SCRIPT_CACHE_DB", "script_cache.db")
+
+ARXIV_URL_PATTERN = re.compile(
+    r'arxiv\.org/(?:abs|pdf|html)/((?:\d{4}\.\d{4,5})|(?:[a-z\-]+(?:\.[A-Z]{2})?/\d{7}))(?:v\d+)?(?:\.pdf)?',
+    re.IGNORECASE,
+)
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "ref")
+
+
+def parse_arxiv_id(url: str) -> Union[str, None]:
+    """Extract the version-less arXiv ID from an abs/pdf/html URL."""
+    match = ARXIV_URL_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+def normalize_url(url: str) -> str:
+    """Lower-case scheme and host, drop www., fragments, tracking params and trailing slashes."""
+    parts = urlsplit(url.strip() if "://" in url else f"https://{url.strip()}")
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith(TRACKING_PARAMS)
+    ))
+    return urlunsplit((parts.scheme.lower() or "https", host, parts.path.rstrip("/"), query, ""))
+
+
+def canonical_paper_key(url: str) -> str:
+    """arxiv:<id> for arXiv papers so abs and pdf links match, otherwise the normalized URL."""
+    arxiv_id = parse_arxiv_id(url)
+    return f"arxiv:{arxiv_id}" if arxiv_id else f"url:{normalize_url(url)}"
+
+
+def prompt_hash(*prompts: str) -> str:
+    return hashlib.sha256("\n".join(prompts).encode("utf-8")).hexdigest()[:16]
+
+
+class ScriptCache:
+    """Durable podcast scripts keyed by paper, model and prompt version."""
+
+    def __init__(self, path: str = SCRIPT_CACHE_DB):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with self._lock, closing(sqlite3.connect(self.path, timeout=30)) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS scripts (
+                    paper_key TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt_hash TEXT NOT NULL,
+                    script TEXT NOT NULL,
+                    created_at REAL,
+                    PRIMARY KEY (paper_key, model, prompt_hash)
+                )
+            """)
+
+    def get(self, paper_key: str, model: str, prompt_version: str) -> Union[str, None]:
+        with self._lock, closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            row = conn.execute(
+                "SELECT script FROM scripts WHERE paper_key = ? AND model = ? AND prompt_hash = ?",
+                (paper_key, model, prompt_version),
+            ).fetchone()
+            if row:
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, paper_key: str, model: str, prompt_version: str, script: str) -> None:
+        with self._lock, closing(sqlite3.connect(self.path, timeout=30)) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scripts (paper_key, model, prompt_hash, script, created_at) VALUES (?, ?, ?, ?, ?)",
+                (paper_key, model, prompt_version, script, time.time()),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock, closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM scripts").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
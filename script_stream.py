@@ -0,0 +1,113 @@
+import json
+from typing import Any, List, Tuple, Union
+
+ScriptEvent = Tuple[str, Union[int, None], Any]
+
+
+class ScriptStreamParser:
+    """
+    Incremental parser for a streamed podcast script.
+
+    feed() takes raw model output as it arrives (any leading prose or
+    ```json fence is skipped) and returns (section_key, index, value)
+    events for every top-level key whose value has been completed:
+    index is None for whole sections, and each key_insights block is
+    also emitted early as ("key_insights", i, block) before the whole
+    key_insights list closes.
+    """
+
+    def __init__(self, block_sections=("key_insights",)):
+        self.block_sections = set(block_sections)
+        self.buffer = ""
+        self.pos = 0
+        self.started = False
+        self.finished = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.key = None
+        self.key_start = None
+        self.value_start = None
+        self.block_start = None
+        self.block_index = 0
+
+    def feed(self, text: str) -> List[ScriptEvent]:
+        self.buffer += text
+        events = []
+        while self.pos < len(self.buffer) and not self.finished:
+            i = self.pos
+            ch = self.buffer[i]
+            self.pos += 1
+            if not self.started:
+                if ch == "{":
+                    self.started = True
+                    self.depth = 1
+                continue
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.key_start is not None:
+                        self.key = self._decode(self.buffer[self.key_start:i + 1])
+                        self.key_start = None
+                continue
+            if self.depth == 1:
+                self._top_level(ch, i, events)
+                continue
+            if ch == '"':
+                self.in_string = True
+            elif ch in "[{":
+                if self.depth == 2 and self.key in self.block_sections:
+                    self.block_start = i
+                self.depth += 1
+            elif ch in "]}":
+                self.depth -= 1
+                if self.depth == 2 and self.block_start is not None:
+                    self._emit(events, self.key, self.block_index, self.buffer[self.block_start:i + 1])
+                    self.block_index += 1
+                    self.block_start = None
+                elif self.depth == 1:
+                    self._emit(events, self.key, None, self.buffer[self.value_start:i + 1])
+                    self._reset_member()
+        return events
+
+    def _top_level(self, ch: str, i: int, events: List[ScriptEvent]) -> None:
+        if self.key is None:
+            if ch == '"':
+                self.key_start = i
+                self.in_string = True
+            elif ch == "}":
+                self.finished = True
+            return
+        if self.value_start is None:
+            if ch.isspace() or ch == ":":
+                return
+            self.value_start = i
+        if ch in ",}":
+            self._emit(events, self.key, None, self.buffer[self.value_start:i].strip())
+            self._reset_member()
+            self.finished = ch == "}"
+        elif ch == '"':
+            self.in_string = True
+        elif ch in "[{":
+            self.depth += 1
+
+    def _reset_member(self) -> None:
+        self.key = None
+        self.value_start = None
+        self.block_index = 0
+
+    def _decode(self, raw: str) -> Any:
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+
+    def _emit(self, events: List[ScriptEvent], key: str, index: Union[int, None], raw: str) -> None:
+        try:
+            events.append((key, index, json.loads(raw)))
+        except json.JSONDecodeError as e:
+            print(f"Skipping malformed script section {key!r}: {e}")
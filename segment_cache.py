@@ -0,0 +1,124 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+
+SEGMENT_NAME = re.compile(r"^[0-9a-f]{32}\.[a-z0-9]+$")
+
+
+class SegmentCache:
+    """
+    Content-addressed store for synthesized dialogue segments, evicted LRU
+    once the directory grows past max_bytes. Only files named like the
+    cache's own entries (<md5 key>.<ext>) are counted and evicted, so
+    anything else kept in the directory is left alone.
+    """
+
+    def __init__(self, cache_dir="segment_cache", max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = None
+        self._total_bytes = 0
+
+    @staticmethod
+    def key(text, voice, lang="en", backend="gtts"):
+        """Hash of everything that changes the rendered audio."""
+        return hashlib.md5(f"{backend}|{voice}|{lang}|{text}".encode("utf-8")).hexdigest()
+
+    def _load_index(self):
+        if self._entries is not None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        files = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not SEGMENT_NAME.match(name) or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            files.append((stat.st_mtime, name, stat.st_size))
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    def _hit(self, name):
+        self._load_index()
+        path = os.path.join(self.cache_dir, name)
+        if name in self._entries and os.path.exists(path):
+            self._entries.move_to_end(name)
+            self.hits += 1
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return path
+        self._total_bytes -= self._entries.pop(name, 0)
+        self.misses += 1
+        return None
+
+    def get_bytes(self, key, ext="mp3"):
+        """Return the cached segment's contents for key, or None on a miss."""
+        with self._lock:
+            path = self._hit(f"{key}.{ext}")
+            if path is None:
+                return None
+            try:
+                with open(path, "rb") as f:
+                    return f.read()
+            except OSError:
+                self._total_bytes -= self._entries.pop(f"{key}.{ext}", 0)
+                return None
+
+    def put_bytes(self, key, data, ext="mp3"):
+        """Atomically write an in-memory segment into the cache and return its path."""
+        return self._store(f"{key}.{ext}", lambda tmp_file: tmp_file.write(data))
+
+    def _store(self, name, write):
+        with self._lock:
+            self._load_index()
+            path = os.path.join(self.cache_dir, name)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file:
+                    write(tmp_file)
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            size = os.path.getsize(path)
+            self._total_bytes += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+            self._evict()
+            return path if name in self._entries else None
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError as e:
+                print(f"Error evicting cached segment {name}: {e}")
+
+    def stats(self):
+        with self._lock:
+            self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,79 @@
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import arxiv_api
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <title type="html">ArXiv Query: search_query=all:attention</title>
+  <entry>
+    <id>http://arxiv.org/abs/1706.03762v7</id>
+    <updated>2023-08-02T00:41:18Z</updated>
+    <published>2017-06-12T17:57:34Z</published>
+    <title>Attention Is All
+      You Need</title>
+    <summary>  The dominant sequence transduction models are based on complex recurrent networks.
+</summary>
+    <author><name>Ashish Vaswani</name></author>
+    <author><name>Noam Shazeer</name></author>
+    <arxiv:doi>10.48550/arXiv.1706.03762</arxiv:doi>
+    <link href="http://arxiv.org/abs/1706.03762v7" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/1706.03762v7" rel="related" type="application/pdf"/>
+    <arxiv:primary_category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+  <entry>
+    <id>http://arxiv.org/abs/hep-th/9901001v1</id>
+    <published>1999-01-01T00:00:00Z</published>
+    <title>An old-style identifier</title>
+    <summary>Abstract.</summary>
+    <author><name>A. Physicist</name></author>
+    <category term="hep-th" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+</feed>
+"""
+
+ERROR_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <id>http://arxiv.org/api/errors#incorrect_id_format_for_1234</id>
+    <title>Error</title>
+    <summary>incorrect id format for 1234</summary>
+  </entry>
+</feed>
+"""
+
+
+def test_query_url_encodes_search_and_ids():
+    url = arxiv_api.query_url("all:attention AND cat:cs.CL", id_list=["1706.03762"], max_results=5)
+    params = parse_qs(urlsplit(url).query)
+    assert url.startswith(arxiv_api.ARXIV_API_URL)
+    assert params["search_query"] == ["all:attention AND cat:cs.CL"]
+    assert params["id_list"] == ["1706.03762"]
+    assert params["max_results"] == ["5"] and params["sortBy"] == ["relevance"]
+
+
+def test_parse_feed():
+    first, second = arxiv_api.parse_feed(FEED)
+    assert first == {
+        "title": "Attention Is All You Need",
+        "summary": "The dominant sequence transduction models are based on complex recurrent networks.",
+        "pdf_url": "http://arxiv.org/pdf/1706.03762v7",
+        "authors": ["Ashish Vaswani", "Noam Shazeer"],
+        "published": "2017-06-12T17:57:34+00:00",
+        "year": 2017,
+        "arxiv_id": "1706.03762v7",
+        "doi": "10.48550/arXiv.1706.03762",
+        "categories": ["cs.CL", "cs.LG"],
+        "entry_id": "http://arxiv.org/abs/1706.03762v7",
+        "source": "arxiv",
+    }
+    assert second["arxiv_id"] == "hep-th/9901001v1"
+    assert second["doi"] is None and second["pdf_url"] is None
+
+
+def test_parse_feed_raises_on_api_errors():
+    with pytest.raises(ValueError, match="incorrect id format"):
+        arxiv_api.parse_feed(ERROR_FEED)
@@ -0,0 +1,77 @@
+import io
+import threading
+import wave
+
+import numpy as np
+
+import audio
+from tts import TTSBackend
+
+
+class ToneBackend(TTSBackend):
+    name = "tone"
+    ext = "wav"
+    max_batch = 2
+
+    def voice_for(self, speaker):
+        return "uk" if "UK" in speaker else "in"
+
+    def synthesize(self, texts, voices):
+        clips = []
+        for text in texts:
+            samples = (np.sin(np.arange(2400) * 0.05) * 8000).astype(np.int16)
+            buffer = io.BytesIO()
+            with wave.open(buffer, "wb") as f:
+                f.setnchannels(1)
+                f.setsampwidth(2)
+                f.setframerate(24000)
+                f.writeframes(samples.tobytes())
+            clips.append(buffer.getvalue())
+        return clips
+
+
+SCRIPT = {
+    section: [{"speaker": "Host 1 (UK)", "dialogue": f"{section} line {i}"} for i in range(3)]
+    for section in ["host_intro", "paper_overview", "outro"]
+}
+
+
+def test_slow_section_callback_does_not_stall_synthesis(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio, "segment_cache", audio.SegmentCache(str(tmp_path / "segments")))
+    release = threading.Event()
+    published = []
+
+    def section_callback(section_key, segment):
+        release.wait(5)
+        published.append(section_key)
+
+    renderer = audio.PodcastRenderer(max_workers=2, section_callback=section_callback, backend=ToneBackend())
+    for section_key in audio.SECTIONS:
+        renderer.add_section(section_key, SCRIPT.get(section_key))
+    futures = [future for section_futures in renderer.futures.values() for future in section_futures]
+    audio.wait(futures, timeout=5)
+    assert all(future.done() for future in futures)
+    assert published == []
+
+    release.set()
+    output_path = renderer.finish(str(tmp_path / "podcasts"), fmt="wav")
+    assert published == ["host_intro", "paper_overview", "outro"]
+    assert output_path.endswith(".wav")
+
+
+def test_episode_pcm_matches_joining_the_float_arrays():
+    rng = np.random.default_rng(0)
+    arrays = [(rng.standard_normal((4800, 1)) * 0.3).astype(np.float32) for _ in range(5)]
+    arrays[3][10] = 1.5
+    episode = audio.EpisodePCM(24000, 2, 1)
+    episode.add(arrays[:2])
+    episode.add(arrays[2:])
+    gain = episode.gain()
+    assert gain == audio.normalization_gain(arrays, 24000)
+
+    joined = episode.join(gain)
+    expected = np.frombuffer(bytes(audio.join_segments(arrays, 24000, 2, gain).raw_data), dtype=np.int16)
+    actual = np.frombuffer(bytes(joined.raw_data), dtype=np.int16)
+    assert len(actual) == len(expected) == 5 * 4800
+    assert np.abs(actual.astype(int) - expected).max() <= 1
+    assert episode.sections == [] and len(episode.data) == 0
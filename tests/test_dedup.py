@@ -0,0 +1,50 @@
+import pytest
+
+from dedup import deduplicate_papers
+
+DISTINCT_PAIRS = [
+    ("Attention Is All You Need", "Attention Is Almost All You Need"),
+    ("Large Language Models for Code Generation", "Large Language Models for Code Generation: A Survey"),
+    ("Graph Neural Networks for Molecular Property Prediction",
+     "Graph Neural Networks for Molecular Property Prediction: A Survey"),
+]
+
+
+@pytest.mark.parametrize("first, second", DISTINCT_PAIRS)
+def test_different_papers_with_similar_titles_stay_apart(first, second):
+    papers = [{"title": first, "source": "arxiv"}, {"title": second, "source": "semantic_scholar"}]
+    assert [paper["title"] for paper in deduplicate_papers(papers)] == [first, second]
+
+
+def test_near_identical_titles_merge():
+    papers = [
+        {"title": "Deep Residual Learning for Image Recognition", "source": "arxiv", "year": 2015},
+        {"title": "Deep Residual Learning for Image Recogniton", "source": "semantic_scholar", "citationCount": 9000},
+    ]
+    [merged] = deduplicate_papers(papers)
+    assert merged["sources"] == ["arxiv", "semantic_scholar"]
+    assert merged["citationCount"] == 9000
+
+
+def test_conflicting_ids_or_years_block_title_merges():
+    title, typo = "Deep Residual Learning for Image Recognition", "Deep Residual Learning for Image Recogniton"
+    assert len(deduplicate_papers([{"title": title, "arxiv_id": "1512.03385"}, {"title": typo, "arxiv_id": "1603.05027"}])) == 2
+    assert len(deduplicate_papers([{"title": title, "year": 2015}, {"title": typo, "year": 2016}])) == 2
+
+
+def test_shared_arxiv_id_merges_across_sources():
+    papers = [
+        {"title": "Attention Is All You Need", "arxiv_id": "1706.03762v5", "source": "arxiv"},
+        {"title": "Attention is all you need.", "externalIds": {"ArXiv": "1706.03762"}, "source": "semantic_scholar"},
+    ]
+    assert len(deduplicate_papers(papers)) == 1
+
+
+def test_deduplicating_twice_keeps_every_source():
+    papers = [
+        {"title": "Attention Is All You Need", "arxiv_id": "1706.03762", "source": "arxiv"},
+        {"title": "Attention is All you Need", "externalIds": {"ArXiv": "1706.03762"}, "source": "semantic_scholar"},
+    ]
+    once = deduplicate_papers(papers)
+    assert once[0]["sources"] == ["arxiv", "semantic_scholar"]
+    assert deduplicate_papers(once)[0]["sources"] == ["arxiv", "semantic_scholar"]
@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+import httpx
+
+import http_client
+from http_client import AsyncPooledClient, HostPolicy, TokenBucket
+
+
+def test_refund_returns_an_unused_token():
+    bucket = TokenBucket(rate=1.0, burst=1)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() > 0.9
+    bucket.refund()
+    assert bucket.reserve() > 0.9
+    assert bucket.reserve() > 1.9
+
+
+def test_cancelled_wait_does_not_delay_later_requests(monkeypatch):
+    monkeypatch.setitem(http_client.HOST_POLICIES, "paced.test", HostPolicy(rate=2.0, concurrency=1))
+
+    async def handler(request):
+        return httpx.Response(200)
+
+    async def run():
+        client = AsyncPooledClient()
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        started = time.monotonic()
+        await client.get("http://paced.test/first")
+        abandoned = asyncio.ensure_future(client.get("http://paced.test/abandoned"))
+        await asyncio.sleep(0.1)
+        abandoned.cancel()
+        await client.get("http://paced.test/next")
+        elapsed = time.monotonic() - started
+        await client.aclose()
+        return elapsed
+
+    # The abandoned request reserved the slot at 0.5s; without the refund
+    # the next one would wait until 1.0s.
+    assert asyncio.run(run()) < 0.8
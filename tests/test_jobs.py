@@ -0,0 +1,137 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+import jobs
+from jobs import JobQueue, JobStore
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_queues_sharing_a_store_run_each_job_once(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    runs = []
+    release = threading.Event()
+
+    def runner(job, report):
+        runs.append(job["id"])
+        release.wait(5)
+        return "episode.mp3"
+
+    first = JobQueue(store, runner, max_workers=1)
+    second = JobQueue(JobStore(store.path), runner, max_workers=1)
+    try:
+        job = first.submit("https://arxiv.org/abs/1706.03762")
+        assert second.submit("https://arxiv.org/pdf/1706.03762v5").get("id") == job["id"]
+        assert second.coalesced == 1
+
+        wait_for(lambda: store.get(job["id"])["status"] == "running")
+        second.resume()
+        release.set()
+        wait_for(lambda: store.get(job["id"])["status"] == "completed")
+        assert runs == [job["id"]]
+    finally:
+        release.set()
+        first.shutdown()
+        second.shutdown()
+
+
+def test_resume_requeues_running_jobs_with_an_expired_lease(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job, created = store.create("https://arxiv.org/abs/1706.03762", "arxiv:1706.03762")
+    assert created and store.claim(job["id"], "dead-worker")
+    assert not store.claim(job["id"], "other-worker")
+    store.update(job["id"], heartbeat_at=time.time() - 120)
+
+    queue = JobQueue(store, lambda job, report: "episode.mp3", max_workers=1, lease=60)
+    try:
+        assert queue.resume() == 1
+        wait_for(lambda: store.get(job["id"])["status"] == "completed")
+    finally:
+        queue.shutdown()
+
+
+def test_resume_leaves_jobs_with_a_live_lease_alone(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job, _ = store.create("https://arxiv.org/abs/1706.03762", "arxiv:1706.03762")
+    store.claim(job["id"], "live-worker")
+
+    queue = JobQueue(store, lambda job, report: "episode.mp3", max_workers=1, lease=60)
+    try:
+        assert queue.resume() == 0
+        assert store.get(job["id"])["status"] == "running"
+    finally:
+        queue.shutdown()
+
+
+def write_sections(job_id, sections, complete):
+    os.makedirs(jobs.section_dir(job_id), exist_ok=True)
+    for file_name, data in sections:
+        with open(os.path.join(jobs.section_dir(job_id), file_name), "wb") as f:
+            f.write(data)
+    jobs.write_manifest(job_id, {
+        "sections": [{"section": file_name, "file": file_name} for file_name, _ in sections], "complete": complete,
+    })
+
+
+def test_stream_waits_for_sections_without_blocking_the_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "PODCAST_DIR", str(tmp_path))
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job, _ = store.create("https://arxiv.org/abs/1706.03762", "arxiv:1706.03762")
+    write_sections(job["id"], [("00_host_intro.mp3", b"intro")], complete=False)
+
+    async def listen():
+        chunks = []
+        async for chunk in jobs.stream_sections(store, job["id"], poll_interval=0.01):
+            chunks.append(chunk)
+            if len(chunks) == 1:
+                assert job["id"] in jobs._open_streams
+                write_sections(job["id"], [("00_host_intro.mp3", b"intro"), ("01_outro.mp3", b"outro")], complete=True)
+        return chunks
+
+    async def main():
+        ticks = 0
+        listener = asyncio.create_task(listen())
+        while not listener.done():
+            ticks += 1
+            await asyncio.sleep(0)
+        return await listener, ticks
+
+    chunks, ticks = asyncio.run(main())
+    assert chunks == [b"intro", b"outro"]
+    assert ticks > 1
+    assert job["id"] not in jobs._open_streams
+
+
+def test_prune_removes_sections_of_finished_jobs_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "PODCAST_DIR", str(tmp_path))
+    store = JobStore(str(tmp_path / "jobs.db"))
+    finished, _ = store.create("https://arxiv.org/abs/1706.03762", "arxiv:1706.03762")
+    recent, _ = store.create("https://arxiv.org/abs/1810.04805", "arxiv:1810.04805")
+    running, _ = store.create("https://arxiv.org/abs/2005.14165", "arxiv:2005.14165")
+    streaming, _ = store.create("https://arxiv.org/abs/1512.03385", "arxiv:1512.03385")
+    for job in (finished, recent, running, streaming):
+        write_sections(job["id"], [("00_host_intro.mp3", b"intro")], complete=True)
+    store.update(finished["id"], status="completed")
+    store.update(streaming["id"], status="completed")
+    store.update(recent["id"], status="failed")
+    with sqlite3.connect(store.path) as conn:
+        conn.execute("UPDATE jobs SET updated_at = 0 WHERE id IN (?, ?)", (finished["id"], streaming["id"]))
+    (tmp_path / "0123456789abcdef0123456789abcdef.mp3").write_bytes(b"episode")
+
+    jobs._stream_opened(streaming["id"], 1)
+    try:
+        assert jobs.prune_sections(store, retention=60) == 1
+    finally:
+        jobs._stream_opened(streaming["id"], -1)
+    assert not os.path.exists(jobs.section_dir(finished["id"]))
+    for job in (recent, running, streaming):
+        assert os.path.isdir(jobs.section_dir(job["id"]))
+    assert (tmp_path / "0123456789abcdef0123456789abcdef.mp3").exists()
@@ -0,0 +1,84 @@
+import hashlib
+import os
+from email.utils import formatdate
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as server
+import media
+
+DATA = bytes(range(256)) * 40
+NAME = f"{hashlib.sha256(DATA).hexdigest()}.mp3"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    (tmp_path / NAME).write_bytes(DATA)
+    monkeypatch.setattr(server, "PODCAST_DIR", str(tmp_path))
+    return TestClient(server.app)
+
+
+def test_not_modified_compares_entity_tags():
+    assert media.not_modified({"if-none-match": '"abc"'}, '"abc"', 0)
+    assert media.not_modified({"if-none-match": 'W/"abc"'}, '"abc"', 0)
+    assert media.not_modified({"if-none-match": '"other", W/"abc"'}, '"abc"', 0)
+    assert media.not_modified({"if-none-match": "*"}, '"abc"', 0)
+    assert not media.not_modified({"if-none-match": '"other"'}, '"abc"', 0)
+    assert not media.not_modified({"if-none-match": '"other"', "if-modified-since": formatdate(100, usegmt=True)}, '"abc"', 50)
+
+
+def test_not_modified_falls_back_to_if_modified_since():
+    assert media.not_modified({"if-modified-since": formatdate(100, usegmt=True)}, '"abc"', 100.7)
+    assert not media.not_modified({"if-modified-since": formatdate(100, usegmt=True)}, '"abc"', 101)
+    assert not media.not_modified({"if-modified-since": "yesterday"}, '"abc"', 0)
+    assert not media.not_modified({}, '"abc"', 0)
+
+
+def test_entity_tag_is_the_content_addressed_name(tmp_path):
+    path = tmp_path / NAME
+    path.write_bytes(DATA)
+    assert media.entity_tag(str(path), os.stat(path)) == f'"{NAME}"'
+    other = tmp_path / "episode.mp3"
+    other.write_bytes(DATA)
+    assert media.entity_tag(str(other), os.stat(other)).startswith(f'"{len(DATA):x}-')
+
+
+@pytest.mark.parametrize("if_none_match", [f'"{NAME}"', f'W/"{NAME}"', "*"])
+def test_media_answers_304_for_matching_if_none_match(client, if_none_match):
+    response = client.get(f"/media/{NAME}", headers={"If-None-Match": if_none_match})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == f'"{NAME}"'
+
+
+def test_media_answers_304_for_if_modified_since(client):
+    last_modified = client.get(f"/media/{NAME}").headers["last-modified"]
+    assert client.get(f"/media/{NAME}", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+
+def test_media_answers_range_requests_with_206(client):
+    response = client.get(f"/media/{NAME}", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == DATA[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(DATA)}"
+    full = client.get(f"/media/{NAME}")
+    assert full.status_code == 200 and full.content == DATA
+    assert full.headers["accept-ranges"] == "bytes"
+    assert full.headers["content-type"] == "audio/mpeg"
+
+
+@pytest.mark.parametrize("file_name", ["episode.mp3", "..%2Fjobs.db", f"{NAME[:-4]}.wav", f"{NAME[:-4]}.opus".upper()])
+def test_media_rejects_names_that_are_not_content_addressed(client, file_name):
+    assert client.get(f"/media/{file_name}").status_code == 404
+
+
+def test_resolve_media_only_encodes_known_profiles_of_existing_sources(tmp_path):
+    (tmp_path / NAME).write_bytes(DATA)
+    assert media.resolve_media(str(tmp_path), NAME) == str(tmp_path / NAME)
+    with pytest.raises(FileNotFoundError):
+        media.resolve_media(str(tmp_path), f"{'0' * 64}.opus")
+    with pytest.raises(FileNotFoundError):
+        media.resolve_media(str(tmp_path), f"{NAME[:-4]}.flac")
+    with pytest.raises(FileNotFoundError):
+        media.resolve_media(str(tmp_path), "../" + NAME)
@@ -0,0 +1,33 @@
+import sqlite3
+
+from paper_store import PaperStore
+
+
+def papers(count):
+    return [
+        {"title": f"Sparse attention for long documents {i}", "abstract": "Sparse attention scales transformers.", "arxiv_id": f"2401.{i:05d}"}
+        for i in range(count)
+    ]
+
+
+def test_stale_fetch_goes_remote_even_with_enough_matches(tmp_path):
+    store = PaperStore(str(tmp_path / "papers.db"), ttl=60, min_results=3)
+    store.add(papers(5))
+    store.record_fetch("sparse attention")
+    assert len(store.lookup("sparse attention")) == 5
+    with sqlite3.connect(store.path) as conn:
+        conn.execute("UPDATE fetches SET fetched_at = 0")
+    assert store.lookup("sparse attention") == []
+
+
+def test_fresh_fetch_with_too_few_matches_goes_remote(tmp_path):
+    store = PaperStore(str(tmp_path / "papers.db"), ttl=60, min_results=3)
+    store.add(papers(2))
+    store.record_fetch("sparse attention")
+    assert store.lookup("sparse attention") == []
+
+
+def test_unfetched_query_goes_remote(tmp_path):
+    store = PaperStore(str(tmp_path / "papers.db"), ttl=60, min_results=3)
+    store.add(papers(5))
+    assert store.lookup("sparse attention") == []
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import pytest
+
+from query_cache import TTLCache
+
+
+def counter(values):
+    calls = []
+
+    async def compute():
+        calls.append(None)
+        await asyncio.sleep(0)
+        return values[len(calls) - 1]
+
+    return compute, calls
+
+
+def test_fresh_entries_are_served_without_recomputing():
+    cache = TTLCache("test", ttl=60)
+    compute, calls = counter(["first", "second"])
+
+    async def main():
+        return [await cache.aget_or_compute("q", compute) for _ in range(2)]
+
+    assert asyncio.run(main()) == ["first", "first"]
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_stale_entry_is_served_while_one_refresh_replaces_it():
+    cache = TTLCache("test", ttl=60, stale_ttl=60)
+    cache._remember("q", ("old", time.time() - 90))
+    compute, calls = counter(["new"])
+
+    async def main():
+        stale = [await cache.aget_or_compute("q", compute) for _ in range(2)]
+        await asyncio.gather(*cache._refresh_tasks)
+        return stale, await cache.aget_or_compute("q", compute)
+
+    stale, fresh = asyncio.run(main())
+    assert stale == ["old", "old"]
+    assert fresh == "new"
+    assert len(calls) == 1
+    assert cache.stats()["stale_hits"] == 2
+
+
+def test_entries_past_the_stale_window_are_recomputed():
+    cache = TTLCache("test", ttl=60, stale_ttl=60)
+    cache._remember("q", ("old", time.time() - 200))
+    compute, calls = counter(["new"])
+    assert asyncio.run(cache.aget_or_compute("q", compute)) == "new"
+    assert cache.stats()["misses"] == 1
+
+
+def test_uncacheable_and_cancelled_results_are_not_stored():
+    cache = TTLCache("test", ttl=60)
+
+    async def error():
+        return [{"error": "429"}]
+
+    async def slow():
+        await asyncio.sleep(1)
+        return ["late"]
+
+    async def main():
+        await cache.aget_or_compute("q", error, lambda value: "error" not in value[0])
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(cache.aget_or_compute("slow", slow), timeout=0.01)
+
+    asyncio.run(main())
+    assert cache.stats()["entries"] == 0
+
+
+def test_entries_persist_across_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    compute, calls = counter(["value", "other"])
+    asyncio.run(TTLCache("test", ttl=60, db_path=path).aget_or_compute("q", compute))
+
+    reopened = TTLCache("test", ttl=60, db_path=path)
+    assert asyncio.run(reopened.aget_or_compute("q", compute)) == "value"
+    assert len(calls) == 1
+    assert asyncio.run(TTLCache("other", ttl=60, db_path=path).aget_or_compute("q", compute)) == "other"
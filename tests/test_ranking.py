@@ -0,0 +1,54 @@
+from datetime import date
+
+import numpy as np
+
+from ranking import bm25_scores, paper_year, rank_papers, tokenize
+
+THIS_YEAR = date.today().year
+
+
+def paper(title, abstract="", year=THIS_YEAR, citations=0):
+    return {"title": title, "abstract": abstract, "year": year, "citationCount": citations}
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("Attention Is All You Need: a Transformer-based model!") == [
+        "attention", "all", "you", "need", "transformer", "based", "model",
+    ]
+    assert tokenize(None) == []
+
+
+def test_bm25_prefers_documents_with_more_query_terms():
+    scores = bm25_scores("sparse attention", [["sparse", "attention"], ["attention"], ["convolution"]])
+    assert scores[0] > scores[1] > scores[2] == 0
+
+
+def test_relevance_outweighs_recency_and_citations():
+    papers = [
+        paper("Convolutional networks for image recognition", citations=100000),
+        paper("Sparse attention for long documents", "Sparse attention scales transformers.", year=THIS_YEAR - 6),
+    ]
+    assert rank_papers("sparse attention", papers)[0] is papers[1]
+
+
+def test_recency_and_citations_break_ties_between_equally_relevant_papers():
+    old = paper("Sparse attention", year=THIS_YEAR - 10)
+    new = paper("Sparse attention", year=THIS_YEAR)
+    cited = paper("Sparse attention", year=THIS_YEAR - 10, citations=500)
+    assert rank_papers("sparse attention", [old, new]) == [new, old]
+    assert rank_papers("sparse attention", [old, cited]) == [cited, old]
+
+
+def test_missing_fields_and_top_k():
+    papers = [paper(f"Sparse attention {i}", year=None) for i in range(15)]
+    papers.append({"title": "Sparse attention without metadata"})
+    ranked = rank_papers("sparse attention", papers, top_k=10)
+    assert len(ranked) == 10
+    assert rank_papers("sparse attention", []) == []
+    assert rank_papers("", papers[:3]) == papers[:3]
+
+
+def test_paper_year_accepts_ints_and_dates():
+    assert paper_year({"year": 2017}) == 2017
+    assert paper_year({"year": "2017-06-12T17:57:34+00:00"}) == 2017
+    assert np.isnan(paper_year({"year": None}))
@@ -0,0 +1,93 @@
+import asyncio
+
+import tools
+from paper_store import PaperStore
+
+
+TOPICS = ["retrieval", "summarization", "translation", "protein folding", "speech recognition"]
+
+
+def arxiv_results(query):
+    return [
+        {"title": f"Sparse attention for {topic}", "summary": "Sparse attention scales transformers.",
+         "arxiv_id": f"2401.{i:05d}", "source": "arxiv"}
+        for i, topic in enumerate(TOPICS)
+    ]
+
+
+def test_partial_fan_out_is_stored_but_not_recorded(tmp_path, monkeypatch):
+    async def arxiv(query):
+        return arxiv_results(query)
+
+    async def semantic_scholar(query):
+        return [{"error": "Semantic Scholar search failed: 429"}]
+
+    async def title(user_input):
+        return None
+
+    store = PaperStore(str(tmp_path / "papers.db"), ttl=60, min_results=3)
+    monkeypatch.setattr(tools, "paper_store", store)
+    monkeypatch.setattr(tools, "afind_title", title)
+    monkeypatch.setattr(tools, "asearch_arxiv", arxiv)
+    monkeypatch.setattr(tools, "asearch_semantic_scholar", semantic_scholar)
+
+    papers, complete = asyncio.run(tools.afetch_remote_papers("partial sparse attention"))
+    assert len(papers) == 5 and not complete
+
+    asyncio.run(tools.aprocess_input("partial sparse attention"))
+    assert store.stats()["entries"] == 5
+    assert store.stats()["queries"] == 0
+
+
+SEMANTIC_SCHOLAR_RESPONSE = {
+    "total": 2, "offset": 0,
+    "data": [
+        {
+            "paperId": "204e3073870fae3d05bcbc2f6a8e263d9b72e776",
+            "externalIds": {"ArXiv": "1706.03762", "DBLP": "conf/nips/VaswaniSPUJGKP17", "CorpusId": 13756489},
+            "url": "https://www.semanticscholar.org/paper/204e3073870fae3d05bcbc2f6a8e263d9b72e776",
+            "title": "Attention is All you Need",
+            "venue": "Neural Information Processing Systems",
+            "year": 2017,
+            "citationCount": 120000,
+            "openAccessPdf": None,
+            "abstract": "The dominant sequence transduction models are based on complex recurrent networks.",
+            "authors": [{"authorId": "40348417", "name": "Ashish Vaswani"}, {"authorId": "1846258", "name": "Noam Shazeer"}],
+        },
+        {
+            "paperId": "df2b0e26d0599ce3e70df8a9da02e51594e0e992",
+            "externalIds": {"DOI": "10.18653/V1/N19-1423", "CorpusId": 52967399},
+            "url": "https://www.semanticscholar.org/paper/df2b0e26d0599ce3e70df8a9da02e51594e0e992",
+            "title": "BERT: Pre-training of Deep Bidirectional Transformers for Language Understanding",
+            "venue": "North American Chapter of the Association for Computational Linguistics",
+            "year": 2019,
+            "citationCount": 90000,
+            "openAccessPdf": {"url": "https://aclanthology.org/N19-1423.pdf", "status": "HYBRID"},
+            "abstract": None,
+            "authors": [{"authorId": "39172707", "name": "Jacob Devlin"}],
+        },
+    ],
+}
+
+
+def test_semantic_scholar_only_results_are_stored_and_ranked(tmp_path, monkeypatch):
+    async def title(user_input):
+        return None
+
+    async def arxiv(query):
+        return []
+
+    async def semantic_scholar(query):
+        return [tools.semantic_scholar_paper(result) for result in SEMANTIC_SCHOLAR_RESPONSE["data"]]
+
+    store = PaperStore(str(tmp_path / "papers.db"), ttl=60, min_results=3)
+    monkeypatch.setattr(tools, "paper_store", store)
+    monkeypatch.setattr(tools, "afind_title", title)
+    monkeypatch.setattr(tools, "asearch_arxiv", arxiv)
+    monkeypatch.setattr(tools, "asearch_semantic_scholar", semantic_scholar)
+
+    papers = asyncio.run(tools.aprocess_input("s2 only attention transformers"))
+    assert isinstance(papers, list) and len(papers) == 2
+    assert {tuple(paper["authors"]) for paper in papers} == {("Ashish Vaswani", "Noam Shazeer"), ("Jacob Devlin",)}
+    assert store.stats()["entries"] == 2
+    assert store.search("Vaswani")[0]["title"] == "Attention is All you Need"
@@ -0,0 +1,64 @@
+import json
+
+from langchain_core.messages import AIMessageChunk
+
+import llm
+from script_cache import ScriptCache
+from script_stream import ScriptStreamParser
+
+SCRIPT = {
+    "host_intro": [{"speaker": "Host 1 (UK)", "dialogue": "She said \"hello\" and left {twice}."}],
+    "key_insights": [
+        {"title": "First", "dialogue": [{"speaker": "Host 2 (India)", "dialogue": "A \\\\ backslash ]"}]},
+        {"title": "Second", "dialogue": []},
+    ],
+    "outro": "Thanks for listening",
+}
+
+
+def feed_in_chunks(parser, text, size=7):
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return events
+
+
+def test_sections_and_insight_blocks_are_emitted_as_they_close():
+    events = feed_in_chunks(ScriptStreamParser(), json.dumps(SCRIPT, indent=2))
+    assert events == [
+        ("host_intro", None, SCRIPT["host_intro"]),
+        ("key_insights", 0, SCRIPT["key_insights"][0]),
+        ("key_insights", 1, SCRIPT["key_insights"][1]),
+        ("key_insights", None, SCRIPT["key_insights"]),
+        ("outro", None, SCRIPT["outro"]),
+    ]
+
+
+def test_leading_prose_and_json_fence_are_skipped():
+    text = "Here is the script you asked for:\n```json\n" + json.dumps(SCRIPT) + "\n```\nEnjoy!"
+    events = feed_in_chunks(ScriptStreamParser(), text, size=3)
+    assert [(key, index) for key, index, _ in events] == [
+        ("host_intro", None), ("key_insights", 0), ("key_insights", 1), ("key_insights", None), ("outro", None),
+    ]
+
+
+def test_escaped_quotes_and_brackets_inside_strings_do_not_end_a_section():
+    events = ScriptStreamParser().feed(json.dumps({"host_intro": SCRIPT["host_intro"], "outro": "a \"}\" b"}))
+    assert events == [("host_intro", None, SCRIPT["host_intro"]), ("outro", None, "a \"}\" b")]
+
+
+def test_agent_stream_parses_each_message_separately(tmp_path, monkeypatch):
+    class Agent:
+        def stream(self, inputs, config, stream_mode):
+            for message_id, text in [("tool-call", "Calling fetch_arxiv_paper with {\"id\": \""), ("script", json.dumps(SCRIPT))]:
+                for start in range(0, len(text), 9):
+                    yield AIMessageChunk(content=text[start:start + 9], id=message_id), {"langgraph_node": "agent"}
+
+    monkeypatch.setattr(llm.components, "get", lambda name: Agent())
+    monkeypatch.setattr(llm, "script_cache", ScriptCache(str(tmp_path / "scripts.db")))
+    events = []
+    script = llm.process_url("https://example.com/paper", on_section=lambda *event: events.append(event))
+    assert json.loads(script) == SCRIPT
+    assert [(key, index) for key, index, _ in events] == [
+        ("host_intro", None), ("key_insights", 0), ("key_insights", 1), ("key_insights", None), ("outro", None),
+    ]
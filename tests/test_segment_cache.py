@@ -0,0 +1,30 @@
+import os
+
+from segment_cache import SegmentCache
+
+
+def test_files_the_cache_did_not_write_are_not_counted_or_evicted(tmp_path):
+    foreign = tmp_path / "sample.wav"
+    foreign.write_bytes(b"x" * 4096)
+    cache = SegmentCache(str(tmp_path), max_bytes=100)
+    first, second = SegmentCache.key("one", "com"), SegmentCache.key("two", "com")
+
+    cache.put_bytes(first, b"a" * 60)
+    assert cache.stats()["bytes"] == 60
+    assert cache.get_bytes(first) == b"a" * 60
+
+    cache.put_bytes(second, b"b" * 60)
+    assert cache.get_bytes(first) is None
+    assert cache.get_bytes(second) == b"b" * 60
+    assert cache.stats()["evictions"] == 1
+    assert foreign.read_bytes() == b"x" * 4096
+
+
+def test_index_picks_up_existing_entries(tmp_path):
+    key = SegmentCache.key("hello", "co.uk")
+    (tmp_path / f"{key}.mp3").write_bytes(b"a" * 10)
+    (tmp_path / "notes.txt").write_text("kept")
+    cache = SegmentCache(str(tmp_path))
+    assert cache.get_bytes(key) == b"a" * 10
+    assert cache.stats()["entries"] == 1
+    assert os.path.exists(tmp_path / "notes.txt")
@@ -1,182 +1,256 @@
 import os
 import re
-import requests
 import json
 from dotenv import load_dotenv
 load_dotenv()
-import arxiv
-from typing import List, Dict, Any
-from exa_py import Exa
-from langchain_core.tools import tool
-from langchain_google_genai import ChatGoogleGenerativeAI
-import difflib
-
-model = ChatGoogleGenerativeAI(model="gemini-2.0-flash")
-
-try:
-    exa = Exa(api_key=os.environ["EXA_API_KEY"])
-except KeyError:
-    print("Warning: EXA_API_KEY environment variable not found")
-    exa = None
-
-@tool
-def search_and_contents(query: str) -> Dict[str, Any]:
+import asyncio
+from typing import List, Dict, Any, Awaitable, Callable, Tuple, Union
+from urllib.parse import quote
+from query_cache import TTLCache, normalize_query
+from ranking import rank_papers
+from dedup import deduplicate_papers, external_ids
+from keyphrases import keyphrase_title, snippet_digest
+from paper_store import PaperStore
+import arxiv_api
+import components
+
+SOURCE_TIMEOUTS = {
+    "exa": float(os.getenv("EXA_TIMEOUT", "8")),
+    "title": float(os.getenv("TITLE_TIMEOUT", "6")),
+    "arxiv": float(os.getenv("ARXIV_TIMEOUT", "12")),
+    "semantic_scholar": float(os.getenv("SEMANTIC_SCHOLAR_TIMEOUT", "10")),
+}
+ARXIV_MAX_RESULTS = int(os.getenv("ARXIV_MAX_RESULTS", "60"))
+SEMANTIC_SCHOLAR_LIMIT = int(os.getenv("SEMANTIC_SCHOLAR_LIMIT", "30"))
+SEMANTIC_SCHOLAR_API_KEY = os.getenv("SEMANTIC_SCHOLAR_API_KEY")
+QUERY_CACHE_DB = os.getenv("QUERY_CACHE_DB") or None
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_STALE_TTL = float(os.getenv("QUERY_CACHE_STALE_TTL", "0"))
+TITLE_STRATEGY = os.getenv("TITLE_STRATEGY", "llm")
+TITLE_PROMPT_MAX_CHARS = int(os.getenv("TITLE_PROMPT_MAX_CHARS", "4000"))
+title_cache = TTLCache(
+    "title", ttl=float(os.getenv("TITLE_CACHE_TTL", "86400")), maxsize=QUERY_CACHE_SIZE,
+    stale_ttl=QUERY_CACHE_STALE_TTL, db_path=QUERY_CACHE_DB,
+)
+source_caches = {
+    source: TTLCache(
+        source, ttl=float(os.getenv("SOURCE_CACHE_TTL", "3600")), maxsize=QUERY_CACHE_SIZE,
+        stale_ttl=QUERY_CACHE_STALE_TTL, db_path=QUERY_CACHE_DB,
+    )
+    for source in ("arxiv", "semantic_scholar")
+}
+paper_store = PaperStore()
+
+SEMANTIC_SCHOLAR_HEADERS = {
+    "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+    "accept-encoding": "gzip, deflate, br, zstd",
+    "accept-language": "en-US,en;q=0.9,en-IN;q=0.8",
+    "cache-control": "max-age=0",
+    "priority": "u=0, i",
+    "sec-ch-ua": '"Microsoft Edge";v="135", "Not-A.Brand";v="8", "Chromium";v="135"',
+    "sec-ch-ua-mobile": "?1",
+    "sec-ch-ua-platform": '"Android"',
+    "sec-fetch-dest": "document",
+    "sec-fetch-mode": "navigate",
+    "sec-fetch-site": "none",
+    "sec-fetch-user": "?1",
+    "upgrade-insecure-requests": "1",
+    "user-agent": "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Mobile Safari/537.36 Edg/135.0.0.0"
+}
+
+def semantic_scholar_request(query: str) -> Tuple[str, Dict[str, str]]:
+    """Search URL and headers for a Semantic Scholar paper search."""
+    headers = dict(SEMANTIC_SCHOLAR_HEADERS)
+    if SEMANTIC_SCHOLAR_API_KEY:
+        headers["x-api-key"] = SEMANTIC_SCHOLAR_API_KEY
+    api_url = f"https://api.semanticscholar.org/graph/v1/paper/search?query={quote(query)}&limit={SEMANTIC_SCHOLAR_LIMIT}&fields=title,year,authors,abstract,url,openAccessPdf,paperId,citationCount,venue,externalIds"
+    return api_url, headers
+
+def semantic_scholar_paper(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": result.get("title", "No title available"),
+        "summary": result.get("abstract", "No abstract available"),
+        "authors": result.get("authors", []),
+        "year": result.get("year"),
+        "url": result.get("url"),
+        "pdf_url": result.get("openAccessPdf", {}).get("url") if result.get("openAccessPdf") else None,
+        "paperId": result.get("paperId"),
+        "citationCount": result.get("citationCount"),
+        "venue": result.get("venue"),
+        "externalIds": result.get("externalIds") or {},
+        "source": "semantic_scholar",
+        "categories": result.get("fieldsOfStudy", [])
+    }
+
+def is_url(input_string: str) -> bool:
+    """Check if the input string is a URL."""
+    url_pattern = r'^(https?:\/\/)?([\da-z\.-]+)\.([a-z\.]{2,6})([\/\w \.-]*)*\/?$'
+    return bool(re.match(url_pattern, input_string))
+
+def title_prompt(exa_results: Any, strategy: str = TITLE_STRATEGY) -> str:
+    """The title instruction over the full Exa response ("llm") or only its titles and highlights ("llm_trimmed")."""
+    source_text = snippet_digest(exa_results, TITLE_PROMPT_MAX_CHARS) if strategy == "llm_trimmed" else str(exa_results)
+    return "Write a clean title to search on arxiv or semantic search from this text. Return ONLY the title, no quotes, no prefixes, no bullet points, no special characters only neatly spaced words as the most apt title for: " + source_text
+
+def clean_title(raw_title: str) -> Union[str, None]:
+    raw_title = raw_title.strip()
+    if not raw_title:
+        return None
+    title = re.sub(r'[^\w\s]', '', raw_title).strip()
+    return title.split('\n')[0].strip() or None
+
+def source_results_ok(results: Any) -> bool:
+    """Only cache source responses that are not error placeholders."""
+    return isinstance(results, list) and not any("error" in paper for paper in results)
+
+def format_papers(source_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Drop source error placeholders and format every source's papers into
+    one shape, with authors as plain names (Semantic Scholar sends
+    {"authorId", "name"} objects).
+    """
+    papers = []
+    for name in ("arxiv", "semantic_scholar"):
+        for paper in source_results.get(name) or []:
+            if "error" in paper:
+                print(f"Source {name} returned an error: {paper['error']}")
+                continue
+            papers.append(paper)
+    formatted_papers = []
+    for paper in papers:
+        formatted_paper = {
+            "title": paper.get("title", "Unknown Title"),
+            "authors": [author.get("name", "") if isinstance(author, dict) else author for author in paper.get("authors") or []],
+            "year": paper.get("year", paper.get("published", 0)),
+            "abstract": paper.get("abstract", paper.get("summary", "No abstract available")),
+            "url": paper.get("url", paper.get("pdf_url", "")),
+            "source": paper.get("source", "unknown"),
+            "categories": paper.get("categories", []),
+            "id": paper.get("paperId", paper.get("arxiv_id", "")),
+            "citationCount": paper.get("citationCount"),
+            **external_ids(paper)
+        }
+        formatted_papers.append(formatted_paper)
+    return formatted_papers
+
+async def asearch_and_contents(query: str) -> Dict[str, Any]:
     """Search for webpages based on the query and retrieve their contents."""
+    exa = components.get("async_exa")
     if not exa:
         return {"error": "Exa API key not configured"}
     try:
-        results = exa.search_and_contents(
+        results = await exa.search_and_contents(
             query, use_autoprompt=True, num_results=3, text=True, highlights=True
         )
         return {"status": "success", "results": results, "source": "exa"}
     except Exception as e:
         return {"error": f"Exa search failed: {str(e)}"}
 
-@tool
-def find_similar_and_contents(url: str) -> Dict[str, Any]:
+async def afind_similar_and_contents(url: str) -> Dict[str, Any]:
     """Search for webpages similar to a given URL and retrieve their contents."""
+    exa = components.get("async_exa")
     if not exa:
         return {"error": "Exa API key not configured"}
     try:
-        results = exa.find_similar_and_contents(
+        results = await exa.find_similar_and_contents(
             url, num_results=3, text=True, highlights=True
         )
         return {"status": "success", "results": results, "source": "exa"}
     except Exception as e:
         return {"error": f"Exa similar search failed: {str(e)}"}
 
-@tool
-def search_arxiv(query: str) -> List[Dict[str, Any]]:
-    """Search for academic papers from arXiv related to the query."""
+async def asearch_arxiv(query: str) -> List[Dict[str, Any]]:
+    """Search arXiv for papers related to the query: one Atom page over the async HTTP client."""
     try:
-        client = arxiv.Client()
-        search = arxiv.Search(
-            query=query,
-            max_results=60,
-        )
-        papers = []
-        for result in client.results(search):
-            papers.append({
-                "title": result.title,
-                "summary": result.summary,
-                "pdf_url": result.pdf_url,
-                "authors": [a.name for a in result.authors],
-                "published": result.published.isoformat(),
-                "year": result.published.year,
-                "arxiv_id": result.entry_id.split('/')[-1],
-                "categories": result.categories,
-                "source": "arxiv"
-            })
-        return papers
+        response = await components.get("async_http").get(arxiv_api.query_url(query, max_results=ARXIV_MAX_RESULTS))
+        response.raise_for_status()
+        return arxiv_api.parse_feed(response.content)
     except Exception as e:
         return [{"error": f"arXiv search failed: {str(e)}"}]
 
-@tool
-def search_semantic_scholar(query: str) -> List[Dict[str, Any]]:
-    """Search for academic papers from Semantic Scholar related to the query."""
+async def asearch_semantic_scholar(query: str) -> List[Dict[str, Any]]:
+    """Search Semantic Scholar for papers related to the query."""
     try:
-        papers = []
-        headers = {
-            "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-            "accept-encoding": "gzip, deflate, br, zstd",
-            "accept-language": "en-US,en;q=0.9,en-IN;q=0.8",
-            "cache-control": "max-age=0",
-            "priority": "u=0, i",
-            "sec-ch-ua": '"Microsoft Edge";v="135", "Not-A.Brand";v="8", "Chromium";v="135"',
-            "sec-ch-ua-mobile": "?1",
-            "sec-ch-ua-platform": '"Android"',
-            "sec-fetch-dest": "document",
-            "sec-fetch-mode": "navigate",
-            "sec-fetch-site": "none",
-            "sec-fetch-user": "?1",
-            "upgrade-insecure-requests": "1",
-            "user-agent": "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Mobile Safari/537.36 Edg/135.0.0.0"
-        }
-        api_url = f"https://api.semanticscholar.org/graph/v1/paper/search?query={query}&limit=10&fields=title,year,authors,abstract,url,openAccessPdf,paperId,citationCount,venue"
-        response = requests.get(api_url, headers=headers, timeout=10)
+        api_url, headers = semantic_scholar_request(query)
+        response = await components.get("async_http").get(
+            api_url, headers=headers, timeout=SOURCE_TIMEOUTS["semantic_scholar"])
         response.raise_for_status()
-        data = response.json()
-        raw_results = data.get("data", [])
-        for result in raw_results:
-            paper_data = {
-                "title": result.get("title", "No title available"),
-                "summary": result.get("abstract", "No abstract available"),
-                "authors": result.get("authors", []),
-                "year": result.get("year"),
-                "url": result.get("url"),
-                "pdf_url": result.get("openAccessPdf", {}).get("url") if result.get("openAccessPdf") else None,
-                "paperId": result.get("paperId"),
-                "citationCount": result.get("citationCount"),
-                "venue": result.get("venue"),
-                "source": "semantic_scholar",
-                "categories": result.get("fieldsOfStudy", [])
-            }
-            papers.append(paper_data)
-        return papers
+        return [semantic_scholar_paper(result) for result in response.json().get("data", [])]
     except Exception as e:
         return [{"error": f"Semantic Scholar search failed: {str(e)}"}]
-    
-def is_url(input_string: str) -> bool:
-    """Check if the input string is a URL."""
-    url_pattern = r'^(https?:\/\/)?([\da-z\.-]+)\.([a-z\.]{2,6})([\/\w \.-]*)*\/?$'
-    return bool(re.match(url_pattern, input_string))
 
-def process_input(user_input: str) -> str:
-    """Process user input to retrieve the top 10 research papers as a JSON array."""
-    exa_results = None
-    print(f"User input: {user_input}")
+async def afan_out(calls: Dict[str, Callable[[], Awaitable[Any]]], timeouts: Dict[str, float]) -> Dict[str, Any]:
+    """Run independent source calls concurrently on the event loop, keeping whatever finishes within its own deadline."""
+    async def run(name: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return await asyncio.wait_for(call(), timeout=timeouts.get(name, 10))
+        except asyncio.TimeoutError:
+            print(f"Source {name} missed its {timeouts.get(name, 10)}s deadline, skipping")
+        except Exception as e:
+            print(f"Source {name} failed: {e}")
+        return None
+
+    results = await asyncio.gather(*(run(name, call) for name, call in calls.items()))
+    return dict(zip(calls, results))
+
+async def agenerate_title(exa_results: Any, strategy: str = TITLE_STRATEGY) -> Union[str, None]:
+    """
+    Turn the Exa results into a clean search title: local keyphrase
+    extraction over titles and highlights ("keyphrase"), or an LLM call
+    on the trimmed ("llm_trimmed") or full ("llm") results.
+    """
+    if not exa_results:
+        return None
+    if strategy == "keyphrase":
+        return clean_title(keyphrase_title(exa_results))
+    title_response = await components.get("model").ainvoke(title_prompt(exa_results, strategy))
+    return clean_title(title_response.content)
+
+async def afind_title(user_input: str) -> Union[str, None]:
     if is_url(user_input):
-        message = f"Find research papers related to the paper at {user_input}."
-        exa_results = find_similar_and_contents.invoke(user_input)
+        exa_call = lambda: afind_similar_and_contents(user_input)
     else:
-        message = f"Find research papers related to: {user_input}."
-        exa_results = search_and_contents.invoke(message)
+        exa_call = lambda: asearch_and_contents(f"Find research papers related to: {user_input}.")
+    exa_results = (await afan_out({"exa": exa_call}, SOURCE_TIMEOUTS))["exa"]
+    return (await afan_out({"title": lambda: agenerate_title(exa_results)}, SOURCE_TIMEOUTS))["title"]
+
+async def afetch_remote_papers(title: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Papers from every remote source for the title, and whether the fan-out
+    was complete: every source answered within its deadline without error.
+    """
+    source_results = await afan_out({
+        "arxiv": lambda: source_caches["arxiv"].aget_or_compute(
+            title, lambda: asearch_arxiv(title), source_results_ok),
+        "semantic_scholar": lambda: source_caches["semantic_scholar"].aget_or_compute(
+            title, lambda: asearch_semantic_scholar(title), source_results_ok),
+    }, SOURCE_TIMEOUTS)
+    complete = all(source_results_ok(results) for results in source_results.values())
+    return format_papers(source_results), complete
+
+async def aprocess_input(user_input: str) -> str:
+    """
+    Retrieve the top 10 research papers for the user input. Network calls
+    are awaited on the event loop and the local store runs in a worker thread.
+    """
+    print(f"User input: {user_input}")
     try:
-        title = None
-        if exa_results:
-            title_prompt = "Write a clean title to search on arxiv or semantic search from this text. Return ONLY the title, no quotes, no prefixes, no bullet points, no special characters only neatly spaced words as the most apt title for: " + str(exa_results)
-            title_response = model.invoke(title_prompt)
-            raw_title = title_response.content.strip()
-            if raw_title:
-                clean_title = re.sub(r'[^\w\s]', '', raw_title).strip()
-                title = clean_title.split('\n')[0].strip()
-                print(f"Generated title: {title}")
-        if not title:
+        title = await title_cache.aget_or_compute(f"{TITLE_STRATEGY}:{normalize_query(user_input)}", lambda: afind_title(user_input))
+        if title:
+            print(f"Generated title: {title}")
+        else:
             title = user_input.strip()
-        arxiv_results = search_arxiv.invoke(title)
-        semantic_scholar_results = search_semantic_scholar.invoke(title)
-        papers = arxiv_results + semantic_scholar_results
-        formatted_papers = []
-        for paper in papers:
-            formatted_paper = {
-                "title": paper.get("title", "Unknown Title"),
-                "authors": paper.get("authors", []),
-                "year": paper.get("year", paper.get("published", 0)),
-                "abstract": paper.get("abstract", paper.get("summary", "No abstract available")),
-                "url": paper.get("url", paper.get("pdf_url", "")),
-                "source": paper.get("source", "unknown"),
-                "categories": paper.get("categories", []),
-                "id": paper.get("paperId", paper.get("arxiv_id", ""))
-            }
-            year = formatted_paper.get("year")
-            formatted_papers.append(formatted_paper)
-        seen_ids = set()
-        seen_titles = set()
-        deduplicated_papers = []
-        for paper in formatted_papers:
-            paper_id = paper.get("id")
-            paper_title = paper.get("title")
-            if paper_id and paper_id not in seen_ids:
-                seen_ids.add(paper_id)
-                if paper_title and paper_title not in seen_titles:
-                    seen_titles.add(paper_title)
-                    deduplicated_papers.append(paper)
-        close_matches = difflib.get_close_matches(title, [paper["title"] for paper in deduplicated_papers], n=10)
-        relevant_papers = []
-        for paper in deduplicated_papers:
-            if paper["title"] in close_matches:
-                relevant_papers.append(paper)
-        relevant_papers = sorted(relevant_papers, key=lambda x: x.get("year", 0), reverse=True)
-        return relevant_papers
+        papers = await asyncio.to_thread(paper_store.lookup, title)
+        if papers:
+            print(f"Answered {title!r} from the local paper store ({len(papers)} candidates)")
+            papers = deduplicate_papers(papers)
+        else:
+            papers, complete = await afetch_remote_papers(title)
+            papers = deduplicate_papers(papers)
+            if papers:
+                await asyncio.to_thread(paper_store.add, papers)
+            if complete:
+                await asyncio.to_thread(paper_store.record_fetch, title)
+        return rank_papers(title, papers)
     except Exception as e:
-        return json.dumps([{"error": f"Error during processing: {str(e)}"}])
\ No newline at end of file
+        return json.dumps([{"error": f"Error during processing: {str(e)}"}])
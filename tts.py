@@ -0,0 +1,159 @@
+import io
+import os
+import threading
+from typing import Dict, List, Optional
+
+from gtts import gTTS
+
+TTS_BACKEND = os.getenv("TTS_BACKEND", "gtts")
+KOKORO_VOICES = os.getenv("KOKORO_VOICES", "UK=bm_george,India=af_heart,default=af_heart")
+KOKORO_BATCH_SIZE = int(os.getenv("KOKORO_BATCH_SIZE", "16"))
+KOKORO_THREADS = int(os.getenv("KOKORO_THREADS", "0"))
+KOKORO_SAMPLE_RATE = 24000
+
+
+def parse_voice_map(spec: str) -> Dict[str, str]:
+    """"UK=bm_george,India=af_heart" -> {"UK": "bm_george", "India": "af_heart"}."""
+    voices = {}
+    for entry in spec.split(","):
+        pattern, _, voice = entry.partition("=")
+        if pattern.strip() and voice.strip():
+            voices[pattern.strip()] = voice.strip()
+    return voices
+
+
+class TTSBackend:
+    """
+    A speech engine that turns dialogue lines into encoded audio.
+
+    voice_for maps a speaker label from the script to one of the engine's
+    voices. synthesize renders a batch of at most max_batch lines into
+    in-memory clips (ext-encoded bytes, one per line) and raises on failure
+    so the caller can retry. Backends are built once per process through
+    the components registry.
+    """
+
+    name = "base"
+    ext = "mp3"
+    max_batch = 1
+
+    def voice_for(self, speaker: str) -> str:
+        raise NotImplementedError
+
+    def synthesize(self, texts: List[str], voices: List[str]) -> List[bytes]:
+        raise NotImplementedError
+
+    def load(self) -> None:
+        """Load models ahead of the first synthesize call; a no-op for remote engines."""
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS: one HTTP request per line, accents picked by domain."""
+
+    name = "gtts"
+    ext = "mp3"
+    max_batch = 1
+
+    def __init__(self, lang: str = "en"):
+        self.lang = lang
+
+    def voice_for(self, speaker: str) -> str:
+        if "UK" in speaker:
+            return "co.uk"
+        elif "India" in speaker:
+            return "co.in"
+        else:
+            return "com"
+
+    def synthesize(self, texts: List[str], voices: List[str]) -> List[bytes]:
+        clips = []
+        for text, voice in zip(texts, voices):
+            buffer = io.BytesIO()
+            gTTS(text=text, lang=self.lang, tld=voice).write_to_fp(buffer)
+            clips.append(buffer.getvalue())
+        return clips
+
+
+class KokoroBackend(TTSBackend):
+    """
+    Local Kokoro-82M on CPU. The model is loaded once and shared by one
+    pipeline per language (the first letter of a voice name, e.g. "b" for
+    British voices). Lines for the same voice go through the pipeline as
+    one list, so G2P setup and the voice pack are reused across the batch;
+    calls are serialized because torch already spreads each forward pass
+    over the CPU threads.
+    """
+
+    name = "kokoro"
+    ext = "wav"
+
+    def __init__(self, voices: Optional[Dict[str, str]] = None, max_batch: int = KOKORO_BATCH_SIZE,
+                 threads: int = KOKORO_THREADS):
+        self.voices = voices if voices is not None else parse_voice_map(KOKORO_VOICES)
+        self.max_batch = max(1, max_batch)
+        self.threads = threads
+        self.model = None
+        self.pipelines = {}
+        self._lock = threading.Lock()
+
+    def voice_for(self, speaker: str) -> str:
+        for pattern, voice in self.voices.items():
+            if pattern != "default" and pattern in speaker:
+                return voice
+        return self.voices.get("default", "af_heart")
+
+    def load(self) -> None:
+        with self._lock:
+            self._load_model()
+
+    def _load_model(self):
+        if self.model is None:
+            import torch
+            from kokoro import KModel
+            if self.threads:
+                torch.set_num_threads(self.threads)
+            self.model = KModel().to("cpu").eval()
+
+    def _pipeline(self, voice):
+        lang_code = voice[0]
+        if lang_code not in self.pipelines:
+            from kokoro import KPipeline
+            self.pipelines[lang_code] = KPipeline(lang_code=lang_code, model=self.model)
+        return self.pipelines[lang_code]
+
+    def synthesize(self, texts: List[str], voices: List[str]) -> List[bytes]:
+        import numpy as np
+        import soundfile as sf
+        import torch
+
+        clips = [None] * len(texts)
+        by_voice = {}
+        for index, voice in enumerate(voices):
+            by_voice.setdefault(voice, []).append(index)
+        with self._lock:
+            self._load_model()
+            for voice, indexes in by_voice.items():
+                chunks = {index: [] for index in indexes}
+                with torch.inference_mode():
+                    results = self._pipeline(voice)([texts[index] for index in indexes], voice=voice, split_pattern=None)
+                    for result in results:
+                        if result.audio is not None:
+                            chunks[indexes[result.text_index]].append(result.audio.numpy())
+                for index, audio in chunks.items():
+                    if not audio:
+                        raise RuntimeError(f"Kokoro produced no audio for line: {texts[index][:60]!r}")
+                    buffer = io.BytesIO()
+                    sf.write(buffer, np.concatenate(audio), KOKORO_SAMPLE_RATE, format="WAV", subtype="PCM_16")
+                    clips[index] = buffer.getvalue()
+        return clips
+
+
+BACKENDS = {"gtts": GTTSBackend, "kokoro": KokoroBackend}
+
+
+def create_backend(name: str = TTS_BACKEND) -> TTSBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown TTS backend: {name} (expected one of {', '.join(BACKENDS)})")
+    backend = BACKENDS[name]()
+    backend.load()
+    return backend